@@ -0,0 +1,248 @@
+"""
+Benchmark de carga del servicio de auth: /login, /verify-token y /me.
+
+1. Siembra N usuarios por rol en la MongoDB configurada (.env / variables de entorno):
+       python benchmarks/auth_load.py sembrar --usuarios 200
+2. Levanta el servicio de auth SIN rate limit (si no, /login responde 429):
+       RATE_LIMIT_ENABLED=false uvicorn main:app --port 8001   (desde microservices/auth)
+3. Ejecuta la carga y guarda el resultado en JSON:
+       python benchmarks/auth_load.py correr --url http://localhost:8001 \\
+           --concurrencia 32 --duracion 30 --salida resultados/antes.json
+4. Limpia los usuarios sembrados:
+       python benchmarks/auth_load.py limpiar
+
+El lag del event loop y el CPU del proceso se leen de /metrics del servicio
+(event_loop_lag_seconds y process_cpu_seconds_total) antes y después de cada
+escenario. Con varios workers de uvicorn /metrics refleja un solo proceso:
+correr el servicio con un worker para que los números sean comparables.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+PASSWORD = "Bench2026!"
+EMAIL_DOMINIO = "bench.blindcheck.edu"
+ROLES = ("estudiante", "docente", "subdecano")
+ID_PREFIJOS = {"estudiante": "BENCH-EST", "docente": "BENCH-DOC", "subdecano": "BENCH-SUB"}
+
+def _email(rol: str, i: int) -> str:
+    return f"bench-{rol}-{i:05d}@{EMAIL_DOMINIO}"
+
+# =============== SIEMBRA ===============
+
+async def sembrar(usuarios: int):
+    from pymongo import ReplaceOne
+    from common.database import connect_db, close_db
+    from common.utils.encryption import hash_password
+    from common.utils.identity import ROLE_COLLECTIONS, upsert_identity
+
+    await connect_db(appname="auth-benchmark")
+    # Un solo hash para todos: sembrar no debe costar N bcrypt
+    password_hash = hash_password(PASSWORD)
+    for rol in ROLES:
+        operaciones = [
+            ReplaceOne(
+                {"_id": f"{ID_PREFIJOS[rol]}-{i:05d}"},
+                {
+                    "email": _email(rol, i),
+                    "nombre": f"Bench {rol} {i}",
+                    "password": password_hash,
+                    "rol": rol,
+                    "activo": True,
+                    "primer_login": False,
+                    "fecha_registro": datetime.utcnow()
+                },
+                upsert=True
+            )
+            for i in range(usuarios)
+        ]
+        await ROLE_COLLECTIONS[rol].bulk_write(operaciones, ordered=False)
+        for i in range(usuarios):
+            await upsert_identity(_email(rol, i), rol, f"{ID_PREFIJOS[rol]}-{i:05d}")
+        print(f"🌱 {usuarios} {rol}(s) sembrados")
+    await close_db()
+
+async def limpiar():
+    from common.database import connect_db, close_db, identidades_collection
+    from common.utils.identity import ROLE_COLLECTIONS
+
+    await connect_db(appname="auth-benchmark")
+    for rol in ROLES:
+        result = await ROLE_COLLECTIONS[rol].delete_many({"_id": {"$regex": f"^{ID_PREFIJOS[rol]}-"}})
+        print(f"🧹 {result.deleted_count} {rol}(s) eliminados")
+    await identidades_collection.delete_many({"_id": {"$regex": f"@{EMAIL_DOMINIO}$"}})
+    await close_db()
+
+# =============== MÉTRICAS DEL SERVICIO ===============
+
+async def leer_metricas(client: httpx.AsyncClient) -> dict:
+    """CPU del proceso y suma/cuenta del histograma de lag desde /metrics"""
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    valores = {"cpu": 0.0, "lag_sum": 0.0, "lag_count": 0.0}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name == "process_cpu_seconds_total":
+                valores["cpu"] = sample.value
+            elif sample.name == "event_loop_lag_seconds_sum":
+                valores["lag_sum"] = sample.value
+            elif sample.name == "event_loop_lag_seconds_count":
+                valores["lag_count"] = sample.value
+    return valores
+
+# =============== CARGA ===============
+
+def _percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[idx]
+
+async def _obtener_tokens(client: httpx.AsyncClient, usuarios: int, cantidad: int) -> list:
+    """Hace login con un subconjunto de usuarios para tener tokens válidos"""
+    tokens = []
+    for i in range(cantidad):
+        rol = ROLES[i % len(ROLES)]
+        response = await client.post("/api/auth/login", json={
+            "email": _email(rol, (i // len(ROLES)) % usuarios), "password": PASSWORD, "role": rol
+        })
+        response.raise_for_status()
+        tokens.append(response.cookies.get("access_token"))
+    return tokens
+
+def _peticion(escenario: str, n: int, usuarios: int, tokens: list):
+    rol = ROLES[n % len(ROLES)]
+    if escenario == "login":
+        return "POST", "/api/auth/login", {
+            "json": {"email": _email(rol, (n // len(ROLES)) % usuarios), "password": PASSWORD, "role": rol}
+        }
+    headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+    if escenario == "verify-token":
+        return "POST", "/api/auth/verify-token", {"headers": headers}
+    return "GET", "/api/auth/me", {"headers": headers}
+
+async def correr_escenario(url: str, escenario: str, concurrencia: int, duracion: float, usuarios: int, tokens: list) -> dict:
+    latencias = []
+    errores = {}
+    contador = 0
+    limits = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        antes = await leer_metricas(client)
+        fin = time.perf_counter() + duracion
+
+        async def worker():
+            nonlocal contador
+            while time.perf_counter() < fin:
+                n = contador
+                contador += 1
+                metodo, ruta, kwargs = _peticion(escenario, n, usuarios, tokens)
+                # Cada petición con cookies limpias: se mide el header Bearer, no la cookie
+                client.cookies.clear()
+                inicio = time.perf_counter()
+                try:
+                    response = await client.request(metodo, ruta, **kwargs)
+                    codigo = response.status_code
+                except httpx.HTTPError as e:
+                    codigo = type(e).__name__
+                latencia = time.perf_counter() - inicio
+                if codigo == 200:
+                    latencias.append(latencia)
+                else:
+                    errores[str(codigo)] = errores.get(str(codigo), 0) + 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrencia)))
+        transcurrido = time.perf_counter() - inicio
+        despues = await leer_metricas(client)
+
+    ok = len(latencias)
+    total = ok + sum(errores.values())
+    lag_count = despues["lag_count"] - antes["lag_count"]
+    return {
+        "escenario": escenario,
+        "concurrencia": concurrencia,
+        "duracion_s": transcurrido,
+        "peticiones": total,
+        "exitosas": ok,
+        "errores": errores,
+        "throughput_rps": ok / transcurrido if transcurrido else 0,
+        "latencia_ms": {
+            "p50": (_percentil(latencias, 50) or 0) * 1000,
+            "p95": (_percentil(latencias, 95) or 0) * 1000,
+            "p99": (_percentil(latencias, 99) or 0) * 1000,
+            "max": (max(latencias) if latencias else 0) * 1000,
+        },
+        "event_loop_lag_medio_ms": ((despues["lag_sum"] - antes["lag_sum"]) / lag_count * 1000) if lag_count else None,
+        "cpu_s_total": despues["cpu"] - antes["cpu"],
+        "cpu_ms_por_peticion": ((despues["cpu"] - antes["cpu"]) / total * 1000) if total else None,
+    }
+
+async def correr(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+        tokens = await _obtener_tokens(client, args.usuarios, min(args.tokens, args.usuarios * len(ROLES)))
+
+    resultados = []
+    for escenario in args.escenarios:
+        print(f"🏃 {escenario}: concurrencia={args.concurrencia} duración={args.duracion}s")
+        r = await correr_escenario(args.url, escenario, args.concurrencia, args.duracion, args.usuarios, tokens)
+        resultados.append(r)
+        lat = r["latencia_ms"]
+        print(
+            f"   {r['throughput_rps']:.1f} req/s  p50={lat['p50']:.1f}ms p95={lat['p95']:.1f}ms p99={lat['p99']:.1f}ms  "
+            f"lag={r['event_loop_lag_medio_ms'] or 0:.2f}ms  cpu/req={r['cpu_ms_por_peticion'] or 0:.2f}ms  errores={r['errores']}"
+        )
+
+    salida = {
+        "fecha": datetime.utcnow().isoformat(),
+        "url": args.url,
+        "host": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "usuarios_por_rol": args.usuarios,
+        "resultados": resultados,
+    }
+    if args.salida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        with open(args.salida, "w") as f:
+            json.dump(salida, f, indent=2)
+        print(f"💾 Resultados guardados en {args.salida}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga del servicio de auth")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_sembrar = sub.add_parser("sembrar", help="Crea N usuarios por rol")
+    p_sembrar.add_argument("--usuarios", type=int, default=200)
+
+    sub.add_parser("limpiar", help="Elimina los usuarios sembrados")
+
+    p_correr = sub.add_parser("correr", help="Ejecuta los escenarios de carga")
+    p_correr.add_argument("--url", default="http://localhost:8001")
+    p_correr.add_argument("--usuarios", type=int, default=200, help="Usuarios por rol sembrados")
+    p_correr.add_argument("--concurrencia", type=int, default=32)
+    p_correr.add_argument("--duracion", type=float, default=30)
+    p_correr.add_argument("--tokens", type=int, default=30, help="Tokens distintos para /verify-token y /me")
+    p_correr.add_argument("--escenarios", nargs="+", default=["login", "verify-token", "me"],
+                          choices=["login", "verify-token", "me"])
+    p_correr.add_argument("--salida", help="Archivo JSON de resultados")
+
+    args = parser.parse_args()
+    if args.comando == "sembrar":
+        asyncio.run(sembrar(args.usuarios))
+    elif args.comando == "limpiar":
+        asyncio.run(limpiar())
+    else:
+        asyncio.run(correr(args))
+
+if __name__ == "__main__":
+    main()
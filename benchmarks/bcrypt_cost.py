@@ -0,0 +1,59 @@
+"""
+Mide el costo de bcrypt en este host para elegir BCRYPT_ROUNDS.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bcrypt_cost.py --rounds 10 11 12 13 --iteraciones 20 --hilos 2
+
+--hilos debe coincidir con PASSWORD_HASH_WORKERS del servicio de auth: con N hilos
+el throughput de logins está acotado por N x hashes/s de un hilo.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from passlib.hash import bcrypt
+
+PASSWORD = "Benchmark2026!"
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[idx]
+
+def medir(rounds: int, iteraciones: int, hilos: int) -> dict:
+    hasher = bcrypt.using(rounds=rounds)
+    hash_ref = hasher.hash(PASSWORD)
+
+    def verificar(_):
+        inicio = time.perf_counter()
+        hasher.verify(PASSWORD, hash_ref)
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        latencias = list(pool.map(verificar, range(iteraciones)))
+    total = time.perf_counter() - inicio
+
+    return {
+        "rounds": rounds,
+        "hashes_por_segundo": iteraciones / total,
+        "p50_ms": _percentil(latencias, 50) * 1000,
+        "p95_ms": _percentil(latencias, 95) * 1000,
+        "p99_ms": _percentil(latencias, 99) * 1000,
+        "media_ms": statistics.mean(latencias) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bcrypt por nivel de costo")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--iteraciones", type=int, default=20)
+    parser.add_argument("--hilos", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'hash/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for rounds in args.rounds:
+        r = medir(rounds, args.iteraciones, args.hilos)
+        print(f"{r['rounds']:>6} {r['hashes_por_segundo']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
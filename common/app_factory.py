@@ -2,13 +2,14 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from common.config import settings
-
-# Shared Limiter instance
-limiter = Limiter(key_func=get_remote_address)
+from common.database import connect_db, close_db
+from common.indexes import ensure_indexes
+from common.utils.logger import audit_writer
+from common.utils.limiter import limiter
+from common.utils.loop_metrics import loop_lag_monitor
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -47,8 +48,43 @@ def create_app(title: str, description: str, version: str = "1.0.0") -> FastAPI:
         # strict origins is the most important part.
         allow_methods=["*"], 
         allow_headers=["*"],
+        # Headers de paginación por cursor (common/utils/pagination.py)
+        expose_headers=["X-Next-Cursor", "X-Total-Count"],
     )
 
+    # Escritor de logs en segundo plano. Su shutdown se registra antes que close_db
+    # para vaciar la cola mientras el cliente sigue abierto.
+    @app.on_event("startup")
+    async def start_audit_writer_event():
+        await audit_writer.start()
+
+    @app.on_event("shutdown")
+    async def stop_audit_writer_event():
+        await audit_writer.stop()
+
+    # Ciclo de vida del cliente de MongoDB (el pool se configura en Settings)
+    @app.on_event("startup")
+    async def connect_db_event():
+        await connect_db(appname=title)
+
+    @app.on_event("shutdown")
+    async def close_db_event():
+        await close_db()
+
+    # Índices secundarios declarados en common/indexes.py
+    @app.on_event("startup")
+    async def ensure_indexes_event():
+        await ensure_indexes()
+
+    # Retraso del event loop (event_loop_lag_seconds en /metrics)
+    @app.on_event("startup")
+    async def start_loop_lag_monitor_event():
+        await loop_lag_monitor.start()
+
+    @app.on_event("shutdown")
+    async def stop_loop_lag_monitor_event():
+        await loop_lag_monitor.stop()
+
     # Prometheus Metrics
     from prometheus_fastapi_instrumentator import Instrumentator
     Instrumentator().instrument(app).expose(app)
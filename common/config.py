@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,9 +7,83 @@ class Settings(BaseSettings):
     secret_key: str
     encryption_key: str
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 7
+    # Reuso de un refresh token dentro de esta ventana (dos pestañas refrescando a la vez)
+    # se rechaza sin revocar la familia
+    refresh_token_reuse_grace_seconds: int = 10
+    # Segundos que el gateway puede cachear una decisión de /api/auth/introspect
+    introspect_cache_seconds: int = 15
     algorithm: str = "HS256"
     allowed_origins: list[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
+    # Pool de conexiones de MongoDB (ajustable por servicio vía variables de entorno)
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_connect_timeout_ms: int = 10000
+    mongo_server_selection_timeout_ms: int = 10000
+    mongo_wait_queue_timeout_ms: Optional[int] = None
+
+    # Caché en proceso del catálogo de materias
+    materias_cache_ttl_seconds: int = 300
+    materias_cache_check_seconds: int = 5
+
+    # Paginación por cursor de los listados
+    default_page_size: int = 100
+    max_page_size: int = 500
+
+    # Costo de bcrypt (log2 de iteraciones). Medir con benchmarks/bcrypt_cost.py antes de cambiarlo:
+    # los hashes con otro costo se rehashean en el siguiente login exitoso.
+    bcrypt_rounds: int = 12
+
+    # Pool dedicado para bcrypt (hash/verify fuera del event loop)
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
+
+    # Uploads de evidencias: tamaño máximo y tamaño de bloque al escribir a disco
+    max_upload_bytes: int = 20 * 1024 * 1024
+    upload_chunk_size: int = 1024 * 1024
+
+    # Almacenamiento por contenido de evidencias: recolector de archivos sin referencias
+    archivos_gc_interval_seconds: int = 3600
+    archivos_gc_grace_seconds: int = 3600
+
+    # Limpieza de uploads/temp en el servicio de docentes
+    temp_ttl_seconds: int = 6 * 60 * 60
+    temp_quota_bytes: int = 2 * 1024 * 1024 * 1024
+    temp_janitor_interval_seconds: int = 300
+    temp_janitor_batch_size: int = 100
+
+    # Motor de imágenes del servicio de docentes (pool de procesos)
+    image_workers: int = 2
+    image_max_pending: int = 8
+    image_job_timeout_seconds: float = 30
+    image_max_pixels: int = 40_000_000
+
+    # Caché LRU de tokens JWT ya verificados. Un logout se registra en la BD compartida, pero
+    # los demás procesos pueden seguir aceptando el token desde su caché hasta este TTL
+    token_cache_size: int = 10000
+    token_cache_ttl_seconds: int = 15
+
+    # Escritor en segundo plano de la bitácora (logs)
+    audit_log_queue_size: int = 10000
+    audit_log_batch_size: int = 200
+    audit_log_flush_seconds: float = 1.0
+    audit_log_enqueue_timeout_seconds: float = 0.05
+
+    # Rate limiting (slowapi): almacenamiento compartido entre workers/réplicas
+    rate_limit_enabled: bool = True
+    rate_limit_storage_uri: str = "memory://"
+    rate_limit_strategy: str = "moving-window"
+    rate_limit_in_memory_fallback: bool = True
+    rate_limit_key_prefix: str = "blindcheck"
+    # Timeout de conexión/lectura del almacenamiento compartido (la consulta es síncrona
+    # y corre en un hilo por petición limitada)
+    rate_limit_storage_timeout_ms: int = 200
+    # Contador en memoria por proceso que rechaza sin consultar al compartido
+    # cuando el proceso por sí solo ya superó el límite
+    rate_limit_local_precheck: bool = True
+
     class Config:
         env_file = ".env"
 
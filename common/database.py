@@ -1,30 +1,121 @@
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from common.config import settings
+from common.utils.mongo_metrics import PoolCheckoutListener
+
+# El cliente se crea en el arranque del servicio (connect_db, registrado por create_app)
+# con la configuración de pool de Settings, y se cierra en el apagado (close_db).
+# Las colecciones de este módulo son referencias perezosas: resuelven el cliente
+# vigente en cada uso, por eso pueden importarse antes de que exista.
+_client: Optional[AsyncIOMotorClient] = None
+_appname: Optional[str] = None
+# True entre close_db y el siguiente connect_db: el servicio se está apagando
+_closed = False
+
+def _build_client() -> AsyncIOMotorClient:
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "event_listeners": [PoolCheckoutListener()],
+    }
+    if settings.mongo_max_idle_time_ms is not None:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_wait_queue_timeout_ms is not None:
+        options["waitQueueTimeoutMS"] = settings.mongo_wait_queue_timeout_ms
+    if _appname:
+        options["appname"] = _appname
+    return AsyncIOMotorClient(settings.mongodb_url, **options)
+
+def get_client() -> AsyncIOMotorClient:
+    """
+    Cliente vigente. Fuera de un servicio (scripts) se crea bajo demanda.
+    Después de close_db no se recrea: una tarea que sigue usando la BD en el apagado
+    falla en lugar de abrir un pool nuevo que nadie va a cerrar.
+    """
+    global _client
+    if _client is None:
+        if _closed:
+            raise RuntimeError(f"MongoDB ya se cerró ({_appname or 'script'}): no se recrea el cliente durante el apagado")
+        _client = _build_client()
+    return _client
+
+async def connect_db(appname: Optional[str] = None):
+    """Crea el cliente y hace un ping de calentamiento para abrir la primera conexión"""
+    global _appname, _closed
+    _appname = appname
+    _closed = False
+    client = get_client()
+    await client.admin.command("ping")
+    print(f"🔌 MongoDB conectado (maxPoolSize={settings.mongo_max_pool_size}, minPoolSize={settings.mongo_min_pool_size})")
+
+async def close_db():
+    """Cierra el cliente y sus conexiones"""
+    global _client, _closed
+    _closed = True
+    if _client is not None:
+        _client.close()
+        _client = None
+
+class _LazyCollection:
+    """Referencia a una colección que se resuelve contra el cliente vigente"""
+
+    def __init__(self, db_name: str, name: str):
+        self._db_name = db_name
+        self._name = name
+
+    def _resolve(self):
+        return get_client()[self._db_name][self._name]
+
+    def __getattr__(self, item):
+        return getattr(self._resolve(), item)
+
+class _LazyDatabase:
+    """Referencia a una base de datos que se resuelve contra el cliente vigente"""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def get_collection(self, name: str) -> _LazyCollection:
+        return _LazyCollection(self._name, name)
+
+    def __getattr__(self, item):
+        return getattr(get_client()[self._name], item)
 
-client = AsyncIOMotorClient(settings.mongodb_url)
 # Logical Database Separation per Microservice
 # We derive specific DB names from the base name to satisfy the "Database per Service" pattern.
 
 db_base = settings.database_name
 
 # 1. Auth Service Database
-db_auth = client[f"{db_base}_auth"]
+db_auth = _LazyDatabase(f"{db_base}_auth")
 reset_password_collection = db_auth.get_collection("reset_password")
 logs_collection = db_auth.get_collection("logs")
+# Directorio de identidades: email normalizado -> (rol, user_id, activo)
+identidades_collection = db_auth.get_collection("identidades")
+# Refresh tokens (hash SHA-256 como _id, expiración por índice TTL)
+refresh_tokens_collection = db_auth.get_collection("refresh_tokens")
+# Access tokens revocados en logout (hash SHA-256 como _id, expiración por índice TTL)
+tokens_revocados_collection = db_auth.get_collection("tokens_revocados")
 
 # 2. Student Service Database
-db_student = client[f"{db_base}_student"]
+db_student = _LazyDatabase(f"{db_base}_student")
 estudiantes_collection = db_student.get_collection("estudiantes")
 
 # 3. Teacher Service Database
-db_teacher = client[f"{db_base}_teacher"]
+db_teacher = _LazyDatabase(f"{db_base}_teacher")
 docentes_collection = db_teacher.get_collection("docentes")
 materias_collection = db_teacher.get_collection("materias")
 calificaciones_collection = db_teacher.get_collection("calificaciones")
 evidencias_collection = db_teacher.get_collection("evidencias")
+# Sello de versión del catálogo de materias (invalida las cachés en proceso)
+catalogo_versiones_collection = db_teacher.get_collection("catalogo_versiones")
+# Archivos de evidencias por hash de contenido, con contador de referencias
+archivos_collection = db_teacher.get_collection("archivos")
 
 # 4. Admin Service Database
-db_admin = client[f"{db_base}_admin"]
+db_admin = _LazyDatabase(f"{db_base}_admin")
 subdecanos_collection = db_admin.get_collection("subdecanos")
 solicitudes_collection = db_admin.get_collection("solicitudes")
 mensajes_collection = db_admin.get_collection("mensajes")
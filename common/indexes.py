@@ -0,0 +1,163 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+from common.database import (
+    estudiantes_collection, docentes_collection, subdecanos_collection,
+    materias_collection, calificaciones_collection, evidencias_collection, archivos_collection,
+    solicitudes_collection, mensajes_collection,
+    reset_password_collection, logs_collection, identidades_collection,
+    refresh_tokens_collection, tokens_revocados_collection
+)
+
+# Registro declarativo de índices secundarios por colección.
+# Cada entrada documenta el endpoint que la necesita; si se agrega una consulta
+# nueva sobre una colección grande, su índice debe declararse aquí.
+INDEXES = [
+    (estudiantes_collection, [
+        # login / solicitar_reset_password / crear_estudiante
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # docente: listar_estudiantes (orden por nombre)
+        IndexModel([("nombre", ASCENDING), ("_id", ASCENDING)], name="nombre"),
+    ]),
+    (docentes_collection, [
+        # login / solicitar_reset_password / crear_docente
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ]),
+    (subdecanos_collection, [
+        # login / seed_data
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ]),
+    (materias_collection, [
+        # crear_materia (validación de código) y listar_materias (orden por código)
+        IndexModel([("codigo", ASCENDING)], name="codigo"),
+    ]),
+    (calificaciones_collection, [
+        # estudiante: obtener_solicitud
+        IndexModel([("solicitud_id", ASCENDING)], name="solicitud_id"),
+    ]),
+    (evidencias_collection, [
+        # crear_solicitud / obtener_evidencia_solicitud
+        IndexModel(
+            [("docente_id", ASCENDING), ("materia_id", ASCENDING), ("grupo", ASCENDING), ("aporte", ASCENDING)],
+            name="docente_materia_grupo_aporte"
+        ),
+        # docente: listar_evidencias (orden por fecha_subida)
+        IndexModel(
+            [("docente_id", ASCENDING), ("fecha_subida", DESCENDING), ("_id", DESCENDING)],
+            name="docente_fecha_subida"
+        ),
+        # estudiante: obtener_opciones_solicitud
+        IndexModel([("estudiante_id", ASCENDING)], name="estudiante_id"),
+    ]),
+    (solicitudes_collection, [
+        # estudiante: listar_solicitudes
+        IndexModel(
+            [("estudiante_id", ASCENDING), ("fecha_creacion", DESCENDING), ("_id", DESCENDING)],
+            name="estudiante_fecha_creacion"
+        ),
+        # docente: listar_recalificaciones_asignadas / calificar_solicitud
+        IndexModel(
+            [("docente_recalificador_id", ASCENDING), ("estado", ASCENDING), ("fecha_creacion", DESCENDING)],
+            name="recalificador_estado_fecha_creacion"
+        ),
+        # estudiante: listar_solicitudes?estado=
+        IndexModel(
+            [("estudiante_id", ASCENDING), ("estado", ASCENDING), ("fecha_creacion", DESCENDING), ("_id", DESCENDING)],
+            name="estudiante_estado_fecha_creacion"
+        ),
+        # subdecano: listar_solicitudes
+        IndexModel([("fecha_creacion", DESCENDING), ("_id", DESCENDING)], name="fecha_creacion"),
+        # subdecano: listar_solicitudes?estado=
+        IndexModel(
+            [("estado", ASCENDING), ("fecha_creacion", DESCENDING), ("_id", DESCENDING)],
+            name="estado_fecha_creacion"
+        ),
+        # subdecano: eliminar_materia (conteo de solicitudes asociadas)
+        IndexModel([("materia_id", ASCENDING)], name="materia_id"),
+    ]),
+    (mensajes_collection, [
+        # estudiante: listar_mensajes
+        IndexModel(
+            [("destinatario_id", ASCENDING), ("fecha_envio", DESCENDING), ("_id", DESCENDING)],
+            name="destinatario_fecha_envio"
+        ),
+        # estudiante: listar_mensajes?leido=
+        IndexModel(
+            [("destinatario_id", ASCENDING), ("leido", ASCENDING), ("fecha_envio", DESCENDING), ("_id", DESCENDING)],
+            name="destinatario_leido_fecha_envio"
+        ),
+    ]),
+    (archivos_collection, [
+        # recolector de almacenamiento (archivos sin referencias)
+        IndexModel([("refs", ASCENDING), ("fecha_actualizacion", ASCENDING)], name="refs_fecha_actualizacion"),
+    ]),
+    (reset_password_collection, [
+        # solicitar_reset_password (solicitud pendiente por email)
+        IndexModel([("email", ASCENDING), ("estado", ASCENDING)], name="email_estado"),
+        # subdecano: listar_solicitudes_reset
+        IndexModel([("fecha_solicitud", DESCENDING), ("_id", DESCENDING)], name="fecha_solicitud"),
+        # subdecano: listar_solicitudes_reset?estado=
+        IndexModel(
+            [("estado", ASCENDING), ("fecha_solicitud", DESCENDING), ("_id", DESCENDING)],
+            name="estado_fecha_solicitud"
+        ),
+        # subdecano: generar_password_reset_lote (solicitudes reclamadas por un lote)
+        IndexModel([("lote", ASCENDING)], name="lote", sparse=True),
+    ]),
+    (logs_collection, [
+        # subdecano: obtener_logs
+        IndexModel([("fecha", DESCENDING)], name="fecha"),
+    ]),
+    (identidades_collection, [
+        # _id = email normalizado; este índice sirve a la sincronización por usuario
+        IndexModel([("rol", ASCENDING), ("user_id", ASCENDING)], name="rol_user_id"),
+    ]),
+    (refresh_tokens_collection, [
+        # Mongo borra los refresh tokens vencidos
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        # revocación por familia (reutilización detectada / logout)
+        IndexModel([("familia", ASCENDING)], name="familia"),
+    ]),
+    (tokens_revocados_collection, [
+        # Mongo borra la revocación cuando el access token ya venció por sí solo
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]),
+]
+
+def _nombre_completo(collection) -> str:
+    return f"{collection.database.name}.{collection.name}"
+
+async def ensure_indexes():
+    """Crea los índices declarados en INDEXES (operación idempotente)"""
+    for collection, indexes in INDEXES:
+        try:
+            await collection.create_indexes(indexes)
+        except PyMongoError as e:
+            # Un índice inválido (p. ej. emails duplicados con unique) no debe impedir el arranque
+            print(f"⚠️ No se pudieron crear índices en {_nombre_completo(collection)}: {e}")
+
+async def index_report() -> list:
+    """
+    Compara los índices declarados con los existentes.
+    Retorna por colección los índices faltantes, los no declarados y los que
+    no registran accesos desde el último reinicio de MongoDB ($indexStats).
+    """
+    reporte = []
+    for collection, indexes in INDEXES:
+        declarados = {index.document["name"] for index in indexes}
+        existentes = set((await collection.index_information()).keys()) - {"_id_"}
+
+        sin_uso = []
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0:
+                    sin_uso.append(stat["name"])
+        except PyMongoError as e:
+            print(f"⚠️ $indexStats no disponible en {_nombre_completo(collection)}: {e}")
+
+        reporte.append({
+            "coleccion": _nombre_completo(collection),
+            "faltantes": sorted(declarados - existentes),
+            "no_declarados": sorted(existentes - declarados),
+            "sin_uso": sorted(sin_uso)
+        })
+    return reporte
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -61,6 +61,12 @@ class EstudianteResponse(EstudianteBase):
     materias_cursando: List[str] = []
     fecha_registro: datetime
 
+# Proyecciones de los listados de estudiantes (common/utils/queries.py)
+ESTUDIANTE_LISTADO_FIELDS = (
+    "email", "nombre", "carrera", "materias_cursando", "activo", "primer_login", "fecha_registro"
+)
+ESTUDIANTE_VINCULACION_FIELDS = ("nombre", "carrera")
+
 class DocenteBase(BaseModel):
     email: EmailStr
     nombre: str
@@ -103,6 +109,12 @@ class DocenteResponse(DocenteBase):
     grupos_asignados: List[str]
     fecha_registro: datetime
 
+# Proyecciones de los listados de docentes
+DOCENTE_LISTADO_FIELDS = (
+    "email", "nombre", "carrera", "materias", "activo", "primer_login", "fecha_registro"
+)
+DOCENTE_OPCION_FIELDS = ("nombre", "materias")
+
 class SubdecanoBase(BaseModel):
     email: EmailStr
     nombre: str
@@ -123,7 +135,8 @@ class SubdecanoResponse(SubdecanoBase):
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
-    role: UserRole
+    # Opcional: si no se envía, el rol se resuelve en el directorio de identidades
+    role: Optional[UserRole] = None
 
 class LoginResponse(BaseModel):
     message: str = "Login successful"
@@ -162,6 +175,13 @@ class SolicitudResponse(BaseModel):
     calificaciones: Optional[List[dict]] = None
     nota_final: Optional[float] = None
 
+SOLICITUD_LISTADO_FIELDS = (
+    "estudiante_id", "estudiante_nombre_anonimo", "materia_id", "docente_id",
+    "docente_nombre_anonimo", "grupo", "aporte", "calificacion_actual", "motivo", "estado",
+    "fecha_creacion", "fecha_actualizacion", "calificacion_nueva", "comentario_docente",
+    "motivo_rechazo"
+)
+
 class SolicitudUpdateEstado(BaseModel):
     estado: EstadoSolicitud
     motivo_rechazo: Optional[str] = None
@@ -201,8 +221,15 @@ class EvidenciaResponse(BaseModel):
     aporte: str
     descripcion: str
     archivo_url: str
+    # URLs de los derivados por tamaño: {"thumb": ..., "preview": ...}
+    archivo_variantes: Dict[str, str] = {}
     fecha_subida: datetime
 
+EVIDENCIA_LISTADO_FIELDS = (
+    "materia_id", "grupo", "aporte", "descripcion", "archivo_nombre_hash", "archivo_url",
+    "archivo_variantes", "fecha_subida", "codigo_interno", "recortada"
+)
+
 # =============== MODELOS DE MATERIA ===============
 
 class MateriaCreate(BaseModel):
@@ -234,6 +261,10 @@ class MensajeResponse(BaseModel):
     leido: bool
     fecha_envio: datetime
 
+MENSAJE_LISTADO_FIELDS = (
+    "destinatario_id", "remitente", "asunto", "contenido", "tipo", "leido", "fecha_envio"
+)
+
 class MensajeUpdate(BaseModel):
     leido: bool
 
@@ -259,6 +290,13 @@ class SolicitudResetResponse(BaseModel):
     fecha_solicitud: datetime
     fecha_completacion: Optional[datetime] = None
 
+SOLICITUD_RESET_LISTADO_FIELDS = ("email", "rol", "estado", "fecha_solicitud", "fecha_completacion")
+
+class GenerarResetLote(BaseModel):
+    """Lote de solicitudes de reset: ids explícitos o todas las pendientes"""
+    solicitud_ids: List[str] = []
+    todas_pendientes: bool = False
+
 # =============== MODELOS DE LOGS ===============
 
 class LogCreate(BaseModel):
@@ -276,3 +314,5 @@ class LogResponse(BaseModel):
     detalle: Optional[str]
     fecha: datetime
     ip: Optional[str]
+
+LOG_LISTADO_FIELDS = ("usuario_id", "rol", "accion", "detalle", "fecha", "ip")
@@ -1,9 +1,14 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Dict
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from prometheus_client import Counter
 from common.config import settings
+from common.database import tokens_revocados_collection
+import hashlib
+import time
 
 # Definimos el esquema OAuth2. 
 # tokenUrl apunta a la ruta de login (ajustada según tu root_path /api)
@@ -22,14 +27,101 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-def verify_token(token: str):
-    """Verifica y decodifica un token JWT. Retorna el payload o None si falla."""
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+TOKEN_CACHE_REQUESTS = Counter(
+    "auth_token_cache_requests_total",
+    "Consultas a la caché de tokens verificados",
+    ["result"]
+)
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class VerifiedTokenCache:
+    """
+    Caché LRU acotada de claims de tokens ya verificados (y no revocados).
+    La clave es el SHA-256 del token (el token no se guarda en memoria) y cada
+    entrada vive hasta el `exp` del token o `ttl` segundos, lo que llegue antes:
+    el TTL acota cuánto tarda otro proceso en ver un logout.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return _hash(token)
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload, exp = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
         return payload
+
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if exp is None or self.maxsize <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (payload, min(float(exp), time.time() + self.ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        self._entries.pop(self._key(token), None)
+
+    def clear(self):
+        self._entries.clear()
+
+token_cache = VerifiedTokenCache(settings.token_cache_size, settings.token_cache_ttl_seconds)
+
+def _decode_token(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
     except JWTError:
         return None
 
+async def verify_token(token: str):
+    """
+    Verifica y decodifica un token JWT. Retorna el payload o None si falla o fue revocado.
+    La revocación (logout) vive en la BD compartida y solo se consulta al fallar la caché,
+    así que otro servicio puede aceptar un token revocado hasta token_cache_ttl_seconds.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        TOKEN_CACHE_REQUESTS.labels(result="hit").inc()
+        return payload
+    TOKEN_CACHE_REQUESTS.labels(result="miss").inc()
+    payload = _decode_token(token)
+    if payload is None:
+        return None
+    if await tokens_revocados_collection.find_one({"_id": _hash(token)}, {"_id": 1}):
+        return None
+    token_cache.put(token, payload)
+    return payload
+
+async def revoke_token(token: Optional[str]):
+    """Revoca un access token hasta su exp (logout) y lo descarta de la caché local"""
+    if not token:
+        return
+    token_cache.invalidate(token)
+    payload = _decode_token(token)
+    if payload is None or payload.get("exp") is None:
+        return  # inválido o ya vencido: no hay nada que revocar
+    await tokens_revocados_collection.update_one(
+        {"_id": _hash(token)},
+        {"$set": {"expires_at": datetime.utcfromtimestamp(payload["exp"])}},
+        upsert=True
+    )
+
 async def get_current_user(request: Request, token: Optional[str] = Depends(oauth2_scheme)):
     """
     Obtiene el usuario actual. 
@@ -54,7 +146,7 @@ async def get_current_user(request: Request, token: Optional[str] = Depends(oaut
         raise credentials_exception
     
     # 4. Validar el token
-    payload = verify_token(final_token)
+    payload = await verify_token(final_token)
     if payload is None:
         raise credentials_exception
     
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from common.config import settings
+from common.database import materias_collection, catalogo_versiones_collection
+from common.utils.ids import normalize_id, normalize_ids
+
+CATALOGO_MATERIAS = "materias"
+
+class MateriasCatalog:
+    """
+    Caché en proceso (read-through) del catálogo de materias.
+    Indexa las materias por ID canónico y por código. Se recarga completa cuando:
+    - vence el TTL, o
+    - cambia el sello de versión en catalogo_versiones (lo incrementa el servicio
+      admin en cada escritura). El sello se consulta como máximo una vez cada
+      `check_seconds`, por lo que las lecturas normales no tocan la BD.
+    """
+
+    def __init__(self, ttl_seconds: int, check_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.check_seconds = check_seconds
+        self._por_id: Dict[str, dict] = {}
+        self._por_codigo: Dict[str, dict] = {}
+        self._version: Optional[int] = None
+        self._cargado_en = 0.0
+        self._verificado_en = 0.0
+        self._lock = asyncio.Lock()
+
+    def _vigente(self, ahora: float) -> bool:
+        return (
+            self._version is not None
+            and ahora - self._cargado_en < self.ttl_seconds
+            and ahora - self._verificado_en < self.check_seconds
+        )
+
+    async def _leer_version(self) -> int:
+        doc = await catalogo_versiones_collection.find_one({"_id": CATALOGO_MATERIAS})
+        return doc["version"] if doc else 0
+
+    async def _recargar(self, version: int):
+        materias = await materias_collection.find(
+            {}, {"nombre": 1, "codigo": 1, "descripcion": 1}
+        ).to_list(length=None)
+        self._por_id = {normalize_id(m["_id"]): m for m in materias}
+        self._por_codigo = {m["codigo"]: m for m in materias if m.get("codigo")}
+        self._version = version
+        self._cargado_en = time.monotonic()
+
+    async def _asegurar_vigente(self):
+        if self._vigente(time.monotonic()):
+            return
+        async with self._lock:
+            ahora = time.monotonic()
+            if self._vigente(ahora):
+                return
+            version = await self._leer_version()
+            if version != self._version or ahora - self._cargado_en >= self.ttl_seconds:
+                await self._recargar(version)
+            self._verificado_en = ahora
+
+    async def get(self, materia_id: Any) -> Optional[dict]:
+        """Materia por ID (ObjectId o string)"""
+        await self._asegurar_vigente()
+        return self._por_id.get(normalize_id(materia_id))
+
+    async def get_many(self, ids: Iterable[Any]) -> Dict[str, Optional[dict]]:
+        """Retorna {id canónico: materia o None}"""
+        await self._asegurar_vigente()
+        return {id_: self._por_id.get(id_) for id_ in normalize_ids(ids)}
+
+    async def get_by_codigo(self, codigo: str) -> Optional[dict]:
+        """Materia por código"""
+        await self._asegurar_vigente()
+        return self._por_codigo.get(codigo)
+
+    async def all(self) -> List[dict]:
+        """Todas las materias ordenadas por código"""
+        await self._asegurar_vigente()
+        return sorted(self._por_id.values(), key=lambda m: m.get("codigo", ""))
+
+    async def invalidate(self):
+        """Publica una nueva versión del catálogo y descarta la copia local"""
+        await catalogo_versiones_collection.update_one(
+            {"_id": CATALOGO_MATERIAS},
+            {"$inc": {"version": 1}},
+            upsert=True
+        )
+        self._version = None
+
+materias_catalog = MateriasCatalog(
+    ttl_seconds=settings.materias_cache_ttl_seconds,
+    check_seconds=settings.materias_cache_check_seconds
+)
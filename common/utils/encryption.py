@@ -1,11 +1,22 @@
 from cryptography.fernet import Fernet
 from passlib.context import CryptContext
+from prometheus_client import Gauge, Histogram
+from concurrent.futures import ThreadPoolExecutor
 from common.config import settings
+import asyncio
 import base64
 import hashlib
+import time
 
-# Contexto para hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Contexto para hashing de contraseñas (único para todo el proyecto).
+# min/max iguales al costo configurado: needs_update marca cualquier hash con otro costo.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds
+)
 
 # Generar clave de cifrado desde la clave de configuración
 def get_encryption_key():
@@ -23,6 +34,60 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica una contraseña contra su hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Indica si el hash usa un costo distinto al configurado"""
+    return pwd_context.needs_update(hashed_password)
+
+# =============== BCRYPT FUERA DEL EVENT LOOP ===============
+# bcrypt libera el GIL mientras calcula, así que un pool de hilos basta para que
+# un hash lento no bloquee las demás peticiones. El semáforo acota los trabajos
+# pendientes: si se llena, las peticiones esperan su turno (backpressure).
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="bcrypt"
+)
+_hash_slots = asyncio.Semaphore(settings.password_hash_max_pending)
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Operaciones bcrypt esperando un hilo del pool"
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Tiempo en cola antes de que un hilo tome la operación bcrypt"
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Duración de la operación bcrypt en el hilo",
+    ["operation"]
+)
+
+async def _run_in_hash_pool(operation: str, fn, *args):
+    PASSWORD_HASH_QUEUE_DEPTH.inc()
+    encolado = time.perf_counter()
+
+    def job():
+        inicio = time.perf_counter()
+        PASSWORD_HASH_QUEUE_DEPTH.dec()
+        PASSWORD_HASH_QUEUE_WAIT.observe(inicio - encolado)
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_DURATION.labels(operation=operation).observe(time.perf_counter() - inicio)
+
+    async with _hash_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, job)
+
+async def hash_password_async(password: str) -> str:
+    """Hashea una contraseña en el pool de bcrypt"""
+    return await _run_in_hash_pool("hash", hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifica una contraseña en el pool de bcrypt"""
+    return await _run_in_hash_pool("verify", verify_password, plain_password, hashed_password)
+
 def encrypt_data(data: str) -> str:
     """Cifra datos sensibles"""
     if not data:
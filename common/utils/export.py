@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List
+from fastapi.responses import StreamingResponse
+
+# Documentos que se piden a Mongo por lote y bytes acumulados antes de enviar un bloque
+EXPORT_BATCH_SIZE = 500
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _valor_csv(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return ";".join(str(v) for v in value)
+    return str(value)
+
+async def _bloques(lineas: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Agrupa líneas en bloques; el primero se envía de inmediato"""
+    buffer = []
+    tamano = 0
+    primero = True
+    async for linea in lineas:
+        buffer.append(linea)
+        tamano += len(linea)
+        if primero or tamano >= EXPORT_FLUSH_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            tamano = 0
+            primero = False
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+async def _ndjson(cursor, serializer: Callable[[dict], dict]) -> AsyncIterator[str]:
+    async for doc in cursor:
+        yield json.dumps(serializer(doc), default=str, ensure_ascii=False) + "\n"
+
+async def _csv(cursor, fields: List[str], serializer: Callable[[dict], dict]) -> AsyncIterator[str]:
+    salida = io.StringIO()
+    writer = csv.writer(salida)
+
+    def fila(valores) -> str:
+        salida.seek(0)
+        salida.truncate(0)
+        writer.writerow(valores)
+        return salida.getvalue()
+
+    yield fila(fields)
+    async for doc in cursor:
+        data = serializer(doc)
+        yield fila([_valor_csv(data.get(f)) for f in fields])
+
+def export_response(
+    cursor,
+    formato: str,
+    nombre: str,
+    fields: List[str],
+    serializer: Callable[[dict], dict]
+) -> StreamingResponse:
+    """
+    Respuesta en streaming (NDJSON o CSV) sobre un cursor de Motor.
+    El cursor se recorre por lotes de EXPORT_BATCH_SIZE: la memoria no depende
+    del número de filas exportadas.
+    """
+    cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+    if formato == "csv":
+        lineas = _csv(cursor, fields, serializer)
+    else:
+        lineas = _ndjson(cursor, serializer)
+
+    fecha = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    return StreamingResponse(
+        _bloques(lineas),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}-{fecha}.{formato}"'}
+    )
@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Optional
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from common.database import (
+    identidades_collection,
+    estudiantes_collection,
+    docentes_collection,
+    subdecanos_collection
+)
+
+# Directorio de identidades (BD de auth): email normalizado -> (rol, user_id, activo).
+# Lo mantienen sincronizado los endpoints de alta/baja del servicio admin y el seed;
+# rebuild_identity_directory lo reconstruye completo desde las colecciones de usuarios.
+# Un email pertenece a un solo rol: el alta en otro rol se rechaza (IdentityConflictError).
+
+ROLE_COLLECTIONS = {
+    "estudiante": estudiantes_collection,
+    "docente": docentes_collection,
+    "subdecano": subdecanos_collection,
+}
+
+REBUILD_BATCH_SIZE = 500
+
+class IdentityConflictError(Exception):
+    """El email ya está registrado en el directorio con otro rol"""
+
+def normalize_email(email: str) -> str:
+    """Forma canónica del email usada como clave del directorio"""
+    return email.strip().lower()
+
+async def upsert_identity(email: str, rol: str, user_id, activo: bool = True):
+    """
+    Crea o actualiza la identidad de un usuario.
+    Lanza IdentityConflictError si el email ya pertenece a otro rol: el filtro incluye
+    el rol, así el upsert intenta insertar el mismo _id y el índice único lo rechaza.
+    """
+    try:
+        await identidades_collection.update_one(
+            {"_id": normalize_email(email), "rol": rol},
+            {"$set": {
+                "user_id": str(user_id),
+                "activo": activo,
+                "fecha_actualizacion": datetime.utcnow()
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        raise IdentityConflictError(f"El email {email} ya está registrado con otro rol")
+
+async def set_identity_active(rol: str, user_id, activo: bool):
+    """Actualiza el flag activo de la identidad de un usuario"""
+    await identidades_collection.update_many(
+        {"rol": rol, "user_id": str(user_id)},
+        {"$set": {"activo": activo, "fecha_actualizacion": datetime.utcnow()}}
+    )
+
+async def remove_identity(rol: str, user_id):
+    """Elimina la identidad de un usuario borrado"""
+    await identidades_collection.delete_many({"rol": rol, "user_id": str(user_id)})
+
+async def resolve_identity(email: str) -> Optional[dict]:
+    """Resuelve rol y user_id de un email con una sola consulta puntual"""
+    return await identidades_collection.find_one({"_id": normalize_email(email)})
+
+async def rebuild_identity_directory() -> int:
+    """
+    Reconstruye el directorio completo desde estudiantes, docentes y subdecanos.
+    Si un email existe en más de un rol (datos previos al directorio) gana el primero
+    en ese orden, el mismo que usaba la búsqueda del reset de contraseña.
+    """
+    print("🔁 Reconstruyendo directorio de identidades...")
+    inicio = datetime.utcnow()
+    total = 0
+    vistos = set()
+    for rol, collection in ROLE_COLLECTIONS.items():
+        operaciones = []
+        cursor = collection.find({}, {"email": 1, "activo": 1}).batch_size(REBUILD_BATCH_SIZE)
+        async for user in cursor:
+            if not user.get("email"):
+                continue
+            email = normalize_email(user["email"])
+            if email in vistos:
+                print(f"⚠️ Email {email} repetido en {rol}: se conserva el rol anterior")
+                continue
+            vistos.add(email)
+            operaciones.append(ReplaceOne(
+                {"_id": email},
+                {
+                    "rol": rol,
+                    "user_id": str(user["_id"]),
+                    "activo": user.get("activo", True),
+                    "fecha_actualizacion": inicio
+                },
+                upsert=True
+            ))
+            if len(operaciones) >= REBUILD_BATCH_SIZE:
+                await identidades_collection.bulk_write(operaciones, ordered=False)
+                total += len(operaciones)
+                operaciones = []
+        if operaciones:
+            await identidades_collection.bulk_write(operaciones, ordered=False)
+            total += len(operaciones)
+    # Lo que no se tocó en esta pasada ya no corresponde a ningún usuario
+    await identidades_collection.delete_many({"fecha_actualizacion": {"$lt": inicio}})
+    print(f"🏁 Directorio de identidades reconstruido ({total} identidad(es))")
+    return total
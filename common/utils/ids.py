@@ -0,0 +1,35 @@
+from typing import Any, Iterable, List, Optional
+from bson import ObjectId
+
+# Convención de identificadores:
+# - Las referencias guardadas en otros documentos (materia_id, docente_id,
+#   estudiante_id, materias, materias_cursando, ...) se almacenan SIEMPRE como string.
+# - Los _id de las colecciones pueden ser ObjectId (materias creadas por el subdecano)
+#   o strings legibles (DOC0001, EST0001, CS-301). to_db_id resuelve la forma a consultar.
+
+def normalize_id(value: Any) -> Optional[str]:
+    """Forma canónica de una referencia (string)"""
+    if value is None:
+        return None
+    return str(value)
+
+def normalize_ids(values: Iterable[Any]) -> List[str]:
+    """Normaliza una lista de referencias descartando vacíos"""
+    return [str(v) for v in values if v is not None and v != ""]
+
+def to_db_id(value: Any):
+    """Convierte una referencia al tipo con que se guarda el _id (ObjectId o string)"""
+    if isinstance(value, ObjectId):
+        return value
+    value = str(value)
+    if len(value) == 24 and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return value
+
+def to_db_ids(values: Iterable[Any]) -> list:
+    """Convierte varias referencias para usarlas en un filtro $in sobre _id"""
+    return [to_db_id(v) for v in normalize_ids(values)]
+
+def id_filter(value: Any) -> dict:
+    """Filtro por _id listo para find_one / update_one / delete_one"""
+    return {"_id": to_db_id(value)}
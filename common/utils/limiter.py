@@ -1,4 +1,102 @@
+import asyncio
+import functools
+import inspect
+from limits.storage import MemoryStorage
+from limits.strategies import MovingWindowRateLimiter
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.requests import Request
+from common.config import settings
 
-limiter = Limiter(key_func=get_remote_address)
+# Limiter compartido por todos los servicios.
+# El almacenamiento de contadores lo define rate_limit_storage_uri:
+#   - memory://                    contadores por proceso (desarrollo, un solo worker)
+#   - mongodb://mongo:27017        colecciones con índice TTL, compartidas entre réplicas
+#   - redis://host:6379            servidor compatible con Redis (requiere el paquete redis)
+# Con moving-window el conteo es una ventana deslizante atómica en el backend.
+# Si el almacenamiento compartido no responde, se degrada a memoria local
+# (rate_limit_in_memory_fallback) en lugar de rechazar o dejar pasar todo.
+#
+# slowapi consulta el almacenamiento de forma síncrona, así que:
+#   - en los endpoints async la verificación corre en un hilo (asyncio.to_thread),
+#     no en el event loop;
+#   - el cliente del almacenamiento usa timeouts cortos (rate_limit_storage_timeout_ms):
+#     una caída de Mongo cuesta ~200 ms y activa el fallback, no 30 s de espera;
+#   - toda petición admitida se cuenta en el almacenamiento compartido; el contador
+#     local solo rechaza antes cuando el proceso por sí solo ya superó el límite.
+
+def _storage_options(uri: str) -> dict:
+    """Timeouts cortos para el cliente del almacenamiento compartido"""
+    ms = settings.rate_limit_storage_timeout_ms
+    if uri.startswith("mongodb"):
+        return {"serverSelectionTimeoutMS": ms, "connectTimeoutMS": ms, "socketTimeoutMS": ms}
+    if uri.startswith("redis"):
+        return {"socket_timeout": ms / 1000, "socket_connect_timeout": ms / 1000}
+    return {}
+
+class _LocalPrecheckRateLimiter:
+    """
+    Estrategia con un contador local delante del almacenamiento compartido.
+    El límite local es el mismo que el global: si este proceso solo ya lo superó,
+    el total también, y se rechaza sin consultar. Lo que el local admite siempre
+    se cuenta en el compartido, que es quien decide.
+    """
+
+    def __init__(self, compartido):
+        self._compartido = compartido
+        self._local = MovingWindowRateLimiter(MemoryStorage())
+
+    def __getattr__(self, name):
+        # test, get_window_stats, clear... los resuelve el almacenamiento compartido
+        return getattr(self._compartido, name)
+
+    def hit(self, item, *identifiers, cost: int = 1) -> bool:
+        if not self._local.hit(item, *identifiers, cost=cost):
+            return False
+        return self._compartido.hit(item, *identifiers, cost=cost)
+
+class PrecheckLimiter(Limiter):
+    """Limiter de slowapi que verifica fuera del event loop y con rechazo local anticipado"""
+
+    def __init__(self, *args, local_precheck: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if local_precheck and not isinstance(self._storage, MemoryStorage):
+            self._limiter = _LocalPrecheckRateLimiter(self._limiter)
+
+    def limit(self, *args, **kwargs):
+        decorador = super().limit(*args, **kwargs)
+
+        def decorator(func):
+            envuelta = decorador(func)
+            parametros = list(inspect.signature(func).parameters)
+            if not asyncio.iscoroutinefunction(func) or "request" not in parametros:
+                return envuelta
+            # Posición del parámetro request, igual que en el wrapper de slowapi
+            idx = parametros.index("request")
+
+            @functools.wraps(func)
+            async def async_wrapper(*a, **kw):
+                request = kw.get("request", a[idx] if a else None)
+                if self.enabled and isinstance(request, Request) and not getattr(
+                    request.state, "_rate_limiting_complete", False
+                ):
+                    # Misma verificación que haría slowapi, en un hilo; su wrapper ve la
+                    # marca y no la repite
+                    await asyncio.to_thread(self._check_request_limit, request, func, False)
+                    request.state._rate_limiting_complete = True
+                return await envuelta(*a, **kw)
+
+            return async_wrapper
+
+        return decorator
+
+limiter = PrecheckLimiter(
+    key_func=get_remote_address,
+    storage_uri=settings.rate_limit_storage_uri,
+    storage_options=_storage_options(settings.rate_limit_storage_uri),
+    strategy=settings.rate_limit_strategy,
+    enabled=settings.rate_limit_enabled,
+    in_memory_fallback_enabled=settings.rate_limit_in_memory_fallback,
+    key_prefix=settings.rate_limit_key_prefix,
+    local_precheck=settings.rate_limit_local_precheck
+)
@@ -0,0 +1,66 @@
+from typing import Any, Dict, Iterable, Optional
+from common.database import materias_collection, docentes_collection, estudiantes_collection
+from common.utils.ids import normalize_id, normalize_ids, to_db_ids
+
+class ReferenceLoader:
+    """
+    Resuelve referencias por lotes (estilo DataLoader).
+    Acumula los IDs pedidos y los resuelve con UNA consulta $in por colección,
+    deduplicando y memoizando los resultados durante la vida del loader.
+    """
+
+    def __init__(self, collection, projection: Optional[dict] = None):
+        self.collection = collection
+        self.projection = projection
+        self._cache: Dict[str, Optional[dict]] = {}
+        self._pending: set = set()
+
+    def prime(self, ids: Iterable[Any]):
+        """Registra IDs a resolver en el próximo lote"""
+        for id_ in normalize_ids(ids):
+            if id_ not in self._cache:
+                self._pending.add(id_)
+
+    async def _dispatch(self):
+        if not self._pending:
+            return
+        ids = list(self._pending)
+        self._pending.clear()
+        # Marcar como resueltos (None = no existe) antes de consultar
+        for id_ in ids:
+            self._cache[id_] = None
+        cursor = self.collection.find({"_id": {"$in": to_db_ids(ids)}}, self.projection)
+        async for doc in cursor:
+            self._cache[str(doc["_id"])] = doc
+
+    async def load_many(self, ids: Iterable[Any]) -> Dict[str, Optional[dict]]:
+        """Retorna {id canónico: documento o None} para los IDs pedidos"""
+        ids = normalize_ids(ids)
+        self.prime(ids)
+        await self._dispatch()
+        return {id_: self._cache.get(id_) for id_ in ids}
+
+    async def load(self, id_: Any) -> Optional[dict]:
+        """Resuelve un solo ID (usa el lote pendiente si lo hay)"""
+        id_ = normalize_id(id_)
+        if id_ is None:
+            return None
+        self.prime([id_])
+        await self._dispatch()
+        return self._cache.get(id_)
+
+class Loaders:
+    """Loaders de referencias con alcance de petición"""
+
+    def __init__(self):
+        self.materias = ReferenceLoader(materias_collection, {"nombre": 1, "codigo": 1})
+        self.docentes = ReferenceLoader(docentes_collection, {"nombre": 1, "email": 1})
+        self.estudiantes = ReferenceLoader(estudiantes_collection, {"nombre": 1})
+
+def get_loaders() -> Loaders:
+    """
+    Dependencia FastAPI: Depends(get_loaders).
+    FastAPI cachea las dependencias por petición, así que todos los usos
+    dentro de la misma petición comparten la memoización.
+    """
+    return Loaders()
@@ -1,10 +1,135 @@
+import asyncio
+import time
 from datetime import datetime
+from typing import Optional
+from prometheus_client import Counter, Gauge, Histogram
+from common.config import settings
 from common.database import logs_collection
 from common.models.schemas import LogCreate
 
+# =============== ESCRITOR DE LOGS EN SEGUNDO PLANO ===============
+# log_action solo encola la entrada; una tarea del servicio la escribe por lotes
+# con insert_many cuando se junta audit_log_batch_size o pasa audit_log_flush_seconds.
+# Con la cola llena se espera un momento (backpressure) y, si no hay espacio, se descarta.
+
+AUDIT_LOG_QUEUE_DEPTH = Gauge(
+    "audit_log_queue_depth",
+    "Entradas de log esperando ser escritas"
+)
+AUDIT_LOG_FLUSH_DURATION = Histogram(
+    "audit_log_flush_duration_seconds",
+    "Duración del insert_many de un lote de logs"
+)
+AUDIT_LOG_WRITTEN = Counter(
+    "audit_log_written_total",
+    "Entradas de log escritas en la BD"
+)
+AUDIT_LOG_DROPPED = Counter(
+    "audit_log_dropped_total",
+    "Entradas de log descartadas",
+    ["reason"]
+)
+
+class AuditLogWriter:
+    """Cola acotada de entradas de log vaciada por lotes en una tarea de fondo"""
+
+    def __init__(self, max_size: int, batch_size: int, flush_seconds: float, enqueue_timeout: float):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Lote en armado y escritura en curso: stop() los completa si cancela a mitad
+        self._lote: list = []
+        self._escritura: Optional[asyncio.Future] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detiene la tarea y escribe lo que quede en la cola"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._escritura is not None:
+            await self._escritura
+        pendientes, self._lote = self._lote, []
+        while not self._queue.empty():
+            pendientes.append(self._queue.get_nowait())
+            if len(pendientes) >= self.batch_size:
+                await self._flush(pendientes)
+                pendientes = []
+        await self._flush(pendientes)
+
+    async def enqueue(self, entry: dict):
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(entry), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                AUDIT_LOG_DROPPED.labels(reason="cola_llena").inc()
+                return
+        AUDIT_LOG_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def _run(self):
+        while True:
+            self._lote.append(await self._queue.get())
+            limite = time.monotonic() + self.flush_seconds
+            while len(self._lote) < self.batch_size:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    self._lote.append(await asyncio.wait_for(self._queue.get(), timeout=restante))
+                except asyncio.TimeoutError:
+                    break
+            AUDIT_LOG_QUEUE_DEPTH.set(self._queue.qsize())
+            lote, self._lote = self._lote, []
+            # shield: cancelar la tarea no interrumpe un insert_many ya iniciado
+            self._escritura = asyncio.ensure_future(self._flush(lote))
+            await asyncio.shield(self._escritura)
+            self._escritura = None
+
+    async def _flush(self, lote: list):
+        if not lote:
+            return
+        inicio = time.perf_counter()
+        try:
+            await logs_collection.insert_many(lote, ordered=False)
+            AUDIT_LOG_WRITTEN.inc(len(lote))
+            for entry in lote:
+                print(f"📝 LOG: [{entry['rol']}] {entry['usuario_id']} - {entry['accion']}")
+        except Exception as e:
+            AUDIT_LOG_DROPPED.labels(reason="error_bd").inc(len(lote))
+            print(f"❌ Error al registrar {len(lote)} log(s): {e}")
+        finally:
+            AUDIT_LOG_FLUSH_DURATION.observe(time.perf_counter() - inicio)
+
+audit_writer = AuditLogWriter(
+    max_size=settings.audit_log_queue_size,
+    batch_size=settings.audit_log_batch_size,
+    flush_seconds=settings.audit_log_flush_seconds,
+    enqueue_timeout=settings.audit_log_enqueue_timeout_seconds
+)
+
 async def log_action(usuario_id: str, rol: str, accion: str, detalle: str = None, ip: str = None):
     """
     Registra una acción en la colección de logs.
+    Dentro de un servicio se encola para el escritor de fondo; fuera (scripts) se inserta directo.
     """
     try:
         log_entry = {
@@ -15,6 +140,9 @@ async def log_action(usuario_id: str, rol: str, accion: str, detalle: str = None
             "fecha": datetime.utcnow(),
             "ip": ip
         }
+        if audit_writer.running:
+            await audit_writer.enqueue(log_entry)
+            return
         await logs_collection.insert_one(log_entry)
         print(f"📝 LOG: [{rol}] {usuario_id} - {accion}")
     except Exception as e:
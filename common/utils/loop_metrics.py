@@ -0,0 +1,51 @@
+import asyncio
+import time
+from typing import Optional
+from prometheus_client import Gauge, Histogram
+
+# Retraso del event loop: una tarea duerme un intervalo fijo y mide cuánto tarde
+# despertó. Si algo bloquea el loop (bcrypt, Pillow, CPU en el hilo principal),
+# el retraso sube para todas las peticiones del proceso.
+
+LOOP_LAG_INTERVAL_SECONDS = 0.25
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Retraso del event loop respecto al intervalo programado",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+EVENT_LOOP_LAG_LAST = Gauge(
+    "event_loop_lag_last_seconds",
+    "Último retraso medido del event loop"
+)
+
+class EventLoopLagMonitor:
+    """Tarea de fondo que muestrea el retraso del event loop"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            inicio = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - inicio - self.interval)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+
+loop_lag_monitor = EventLoopLagMonitor()
@@ -0,0 +1,48 @@
+import threading
+import time
+from prometheus_client import Counter, Histogram
+from pymongo import monitoring
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Tiempo de espera para obtener una conexión del pool de MongoDB",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+POOL_CHECKOUT_FAILED = Counter(
+    "mongodb_pool_checkout_failed_total",
+    "Intentos fallidos de obtener una conexión del pool de MongoDB",
+    ["reason"]
+)
+
+class PoolCheckoutListener(monitoring.ConnectionPoolListener):
+    """
+    Mide la espera de checkout del pool.
+    Motor ejecuta PyMongo en hilos del executor y el checkout ocurre completo
+    dentro de un mismo hilo, por eso el inicio se guarda en un threading.local.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.inicio = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        inicio = getattr(self._local, "inicio", None)
+        if inicio is not None:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - inicio)
+            self._local.inicio = None
+
+    def connection_check_out_failed(self, event):
+        self._local.inicio = None
+        POOL_CHECKOUT_FAILED.labels(reason=str(event.reason)).inc()
+
+    # Eventos sin métrica asociada
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_checked_in(self, event): pass
@@ -0,0 +1,87 @@
+import base64
+from typing import Iterable, Optional
+from bson import json_util
+from fastapi import HTTPException, Query, Response, status
+from common.config import settings
+from common.utils.queries import projection
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+def encode_cursor(values: list) -> str:
+    """Codifica los valores de la última fila como token opaco"""
+    raw = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> list:
+    """Decodifica un token generado por encode_cursor"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != 2:
+            raise ValueError("cursor mal formado")
+        return values
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginación inválido")
+
+class PageParams:
+    """
+    Parámetros de paginación por cursor (keyset) comunes a los listados.
+    Uso: page: PageParams = Depends()
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, description="Tamaño de página"),
+        cursor: Optional[str] = Query(None, description="Token X-Next-Cursor de la página anterior"),
+        incluir_total: bool = Query(False, description="Calcula X-Total-Count (consulta adicional)")
+    ):
+        self.limit = min(limit or settings.default_page_size, settings.max_page_size)
+        self.cursor = cursor
+        self.incluir_total = incluir_total
+
+async def paginate(
+    collection,
+    query: dict,
+    page: PageParams,
+    response: Response,
+    fields: Iterable[str],
+    sort_field: str = "_id",
+    direction: int = -1
+) -> list:
+    """
+    Retorna una página de documentos ordenados por (sort_field, _id).
+    Solo se leen los campos `fields` declarados para la respuesta (más la clave de orden).
+    El token de la página siguiente se envía en el header X-Next-Cursor y, si se
+    pidió, el total en X-Total-Count. El cuerpo de la respuesta sigue siendo una lista.
+    """
+    op = "$lt" if direction < 0 else "$gt"
+    filtro = query
+
+    if page.cursor:
+        ultimo_valor, ultimo_id = decode_cursor(page.cursor)
+        if sort_field == "_id":
+            keyset = {"_id": {op: ultimo_id}}
+        else:
+            keyset = {"$or": [
+                {sort_field: {op: ultimo_valor}},
+                {sort_field: ultimo_valor, "_id": {op: ultimo_id}}
+            ]}
+        filtro = {"$and": [query, keyset]} if query else keyset
+
+    sort = [("_id", direction)] if sort_field == "_id" else [(sort_field, direction), ("_id", direction)]
+
+    campos = set(fields) | ({sort_field} - {"_id"})
+
+    # Se pide una fila extra para saber si hay página siguiente
+    docs = await collection.find(filtro, projection(campos)).sort(sort).limit(page.limit + 1).to_list(length=page.limit + 1)
+
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        ultimo = docs[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([ultimo.get(sort_field), ultimo["_id"]])
+
+    if page.incluir_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(await collection.count_documents(query))
+
+    return docs
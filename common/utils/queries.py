@@ -0,0 +1,21 @@
+from typing import Iterable, Optional
+
+# Campos que nunca deben salir de la BD en un listado
+SENSITIVE_FIELDS = frozenset({"password", "password_temporal"})
+
+def projection(fields: Iterable[str]) -> dict:
+    """
+    Construye una proyección de inclusión a partir de los campos de una respuesta.
+    Rechaza campos sensibles para que un listado nunca lea hashes de contraseña.
+    """
+    fields = list(fields)
+    if not fields:
+        raise ValueError("La proyección debe declarar al menos un campo")
+    sensibles = SENSITIVE_FIELDS.intersection(fields)
+    if sensibles:
+        raise ValueError(f"Campos sensibles en la proyección: {sorted(sensibles)}")
+    return {field: 1 for field in fields}
+
+def find_projected(collection, query: Optional[dict], fields: Iterable[str]):
+    """collection.find con la proyección declarada para la respuesta"""
+    return collection.find(query or {}, projection(fields))
@@ -0,0 +1,74 @@
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from common.config import settings
+from common.database import refresh_tokens_collection
+
+# Refresh tokens opacos con rotación.
+# En la BD solo se guarda el SHA-256 del token (_id); el índice TTL sobre expires_at
+# borra los vencidos. Cada login abre una "familia": cada /refresh marca el token
+# como usado y emite otro de la misma familia. Presentar un token ya usado indica
+# que fue robado y reutilizado, y revoca la familia completa; salvo dentro de
+# refresh_token_reuse_grace_seconds tras su uso, donde solo se rechaza (varias
+# pestañas refrescando a la vez con la misma cookie).
+
+REFRESH_COOKIE = "refresh_token"
+REFRESH_COOKIE_PATH = "/api/auth"
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+async def issue_refresh_token(user_id: str, rol: str, email: str, familia: Optional[str] = None) -> str:
+    """Emite un refresh token (nueva familia si no se indica una)"""
+    token = secrets.token_urlsafe(32)
+    ahora = datetime.utcnow()
+    await refresh_tokens_collection.insert_one({
+        "_id": _hash(token),
+        "familia": familia or uuid.uuid4().hex,
+        "user_id": str(user_id),
+        "rol": rol,
+        "email": email,
+        "usado": False,
+        "fecha_creacion": ahora,
+        "expires_at": ahora + timedelta(days=settings.refresh_token_expire_days)
+    })
+    return token
+
+async def consume_refresh_token(token: str) -> Optional[dict]:
+    """
+    Marca el token como usado y retorna su documento.
+    Retorna None si no existe, venció o ya se había usado (en ese caso revoca la familia
+    si el reuso ocurre fuera del período de gracia).
+    """
+    ahora = datetime.utcnow()
+    doc = await refresh_tokens_collection.find_one_and_update(
+        {"_id": _hash(token), "usado": False, "expires_at": {"$gt": ahora}},
+        {"$set": {"usado": True, "fecha_uso": ahora}}
+    )
+    if doc:
+        return doc
+    reutilizado = await refresh_tokens_collection.find_one(
+        {"_id": _hash(token), "usado": True}, {"familia": 1, "fecha_uso": 1}
+    )
+    if reutilizado:
+        gracia = timedelta(seconds=settings.refresh_token_reuse_grace_seconds)
+        if reutilizado.get("fecha_uso") and ahora - reutilizado["fecha_uso"] <= gracia:
+            # Refresh concurrente del mismo cliente: la otra petición ya rotó el token
+            return None
+        print(f"⚠️ Refresh token reutilizado, se revoca la familia {reutilizado['familia']}")
+        await revoke_family(reutilizado["familia"])
+    return None
+
+async def revoke_family(familia: str):
+    """Revoca todos los refresh tokens de una familia"""
+    await refresh_tokens_collection.delete_many({"familia": familia})
+
+async def revoke_refresh_token(token: Optional[str]):
+    """Revoca la familia del token presentado (logout)"""
+    if not token:
+        return
+    doc = await refresh_tokens_collection.find_one({"_id": _hash(token)}, {"familia": 1})
+    if doc:
+        await revoke_family(doc["familia"])
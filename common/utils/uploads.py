@@ -0,0 +1,56 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from fastapi import UploadFile
+from common.config import settings
+
+# Escritura de uploads a disco por bloques de tamaño fijo.
+# La escritura corre en un hilo (asyncio.to_thread) para no bloquear el event loop,
+# el SHA-256 se calcula mientras se copia y el upload se corta en cuanto supera
+# max_bytes. La memoria por upload queda acotada por chunk_size.
+
+class UploadTooLargeError(Exception):
+    """El archivo supera el tamaño máximo permitido"""
+
+async def save_upload(
+    archivo: UploadFile,
+    destino: Path,
+    max_bytes: int = None,
+    chunk_size: int = None
+) -> dict:
+    """
+    Copia el upload a `destino` y retorna {"bytes", "sha256"}.
+    Escribe primero en un `.part` y lo renombra al terminar, así un upload
+    cortado nunca deja un archivo final a medias.
+    """
+    max_bytes = max_bytes or settings.max_upload_bytes
+    chunk_size = chunk_size or settings.upload_chunk_size
+
+    # Si el tamaño ya se conoce, se rechaza sin copiar nada
+    if archivo.size is not None and archivo.size > max_bytes:
+        raise UploadTooLargeError(f"El archivo supera {max_bytes} bytes")
+
+    parcial = destino.with_name(destino.name + ".part")
+    sha256 = hashlib.sha256()
+    total = 0
+
+    f = await asyncio.to_thread(open, parcial, "wb")
+    try:
+        while True:
+            chunk = await archivo.read(chunk_size)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLargeError(f"El archivo supera {max_bytes} bytes")
+            sha256.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(parcial.unlink, True)
+        raise
+    await asyncio.to_thread(f.close)
+    await asyncio.to_thread(os.replace, parcial, destino)
+
+    return {"bytes": total, "sha256": sha256.hexdigest()}
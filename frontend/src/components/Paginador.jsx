@@ -0,0 +1,83 @@
+import React, { useState, useEffect, useCallback } from 'react';
+import { getPage } from '../services/api';
+import './Paginador.css';
+
+// Filas por página en los listados de la interfaz (el backend acepta hasta max_page_size)
+export const PAGE_SIZE = 20;
+
+// Estado de un listado paginado por cursor: una página a la vez, con anterior/siguiente.
+// Los cursores de las páginas ya visitadas se guardan para poder volver atrás.
+// Cambiar `params` (ej. un filtro de estado) vuelve a la primera página.
+export const usePaginacion = (url, { params = {}, limit = PAGE_SIZE, incluirTotal = true } = {}) => {
+  const [items, setItems] = useState([]);
+  const [cursores, setCursores] = useState([null]);
+  const [pagina, setPagina] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+  const paramsKey = JSON.stringify(params);
+
+  const cargar = useCallback(async (indice, pila) => {
+    setLoading(true);
+    try {
+      const res = await getPage(url, {
+        cursor: pila[indice],
+        limit,
+        params: JSON.parse(paramsKey),
+        incluirTotal
+      });
+      setItems(res.data);
+      setNextCursor(res.nextCursor);
+      setTotal(res.total);
+      setPagina(indice);
+      setCursores(pila);
+      setError(null);
+    } catch (err) {
+      console.error(`Error al cargar ${url}:`, err);
+      setError(err);
+    } finally {
+      setLoading(false);
+    }
+  }, [url, limit, paramsKey, incluirTotal]);
+
+  useEffect(() => {
+    cargar(0, [null]);
+  }, [cargar]);
+
+  return {
+    items,
+    loading,
+    error,
+    pagina,
+    total,
+    limit,
+    hayAnterior: pagina > 0,
+    haySiguiente: Boolean(nextCursor),
+    anterior: () => pagina > 0 && cargar(pagina - 1, cursores),
+    siguiente: () => nextCursor && cargar(pagina + 1, [...cursores.slice(0, pagina + 1), nextCursor]),
+    recargar: () => cargar(pagina, cursores)
+  };
+};
+
+// Botones anterior/siguiente para un listado de usePaginacion
+const Paginador = ({ pagina, total, limit, hayAnterior, haySiguiente, anterior, siguiente, loading }) => {
+  if (!hayAnterior && !haySiguiente) return null;
+  const paginas = total !== null && total !== undefined ? Math.max(1, Math.ceil(total / limit)) : null;
+
+  return (
+    <div className="paginador">
+      <button className="btn btn-outline btn-sm" onClick={anterior} disabled={!hayAnterior || loading}>
+        ← Anterior
+      </button>
+      <span className="paginador-info">
+        Página {pagina + 1}{paginas ? ` de ${paginas}` : ''}
+      </span>
+      <button className="btn btn-outline btn-sm" onClick={siguiente} disabled={!haySiguiente || loading}>
+        Siguiente →
+      </button>
+    </div>
+  );
+};
+
+export default Paginador;
@@ -3,14 +3,19 @@ import { Camera, Plus, Image, Lock, Check, Eye, X, Trash, ArrowRight, Search, In
 import Layout from '../../components/Layout';
 import AlertModal from '../../components/AlertModal';
 import ImagePixelator from '../../components/ImagePixelator';
-import api from '../../services/api';
+import Paginador, { usePaginacion } from '../../components/Paginador';
+import api, { getPage } from '../../services/api';
 import './Evidencias.css';
 import { buildFileUrl } from '../../utils/url';
 
 const Evidencias = () => {
-  const [evidencias, setEvidencias] = useState([]);
+  // Las evidencias se muestran una página a la vez
+  const paginacion = usePaginacion('/docente/evidencias');
+  const evidencias = paginacion.items;
   const [materias, setMaterias] = useState([]);
   const [estudiantes, setEstudiantes] = useState([]);
+  const [cursorEstudiantes, setCursorEstudiantes] = useState(null);
+  const [cargandoEstudiantes, setCargandoEstudiantes] = useState(false);
   const [loading, setLoading] = useState(true);
 
   const [showModal, setShowModal] = useState(false);
@@ -41,16 +46,21 @@ const Evidencias = () => {
     cargarDatos();
   }, []);
 
+  useEffect(() => {
+    if (paginacion.error) {
+      setAlert({ show: true, type: 'error', title: 'Error', message: 'Error al cargar evidencias' });
+    }
+  }, [paginacion.error]);
+
   const cargarDatos = async () => {
     try {
-      const [evidenciasRes, materiasRes, estudiantesRes] = await Promise.all([
-        api.get('/docente/evidencias'),
+      const [materiasRes, estudiantesRes] = await Promise.all([
         api.get('/docente/materias'),
-        api.get('/docente/estudiantes')
+        getPage('/docente/estudiantes')
       ]);
-      setEvidencias(evidenciasRes.data);
       setMaterias(materiasRes.data);
       setEstudiantes(estudiantesRes.data);
+      setCursorEstudiantes(estudiantesRes.nextCursor);
     } catch (error) {
       console.error('Error al cargar datos:', error);
       setAlert({ show: true, type: 'error', title: 'Error', message: 'Error al cargar evidencias' });
@@ -59,6 +69,21 @@ const Evidencias = () => {
     }
   };
 
+  // Siguiente página de estudiantes para el selector, solo cuando el docente la pide
+  const cargarMasEstudiantes = async () => {
+    if (!cursorEstudiantes) return;
+    setCargandoEstudiantes(true);
+    try {
+      const res = await getPage('/docente/estudiantes', { cursor: cursorEstudiantes });
+      setEstudiantes((prev) => [...prev, ...res.data]);
+      setCursorEstudiantes(res.nextCursor);
+    } catch (error) {
+      console.error('Error al cargar estudiantes:', error);
+    } finally {
+      setCargandoEstudiantes(false);
+    }
+  };
+
   const handleChange = (e) => {
     const { name, value } = e.target;
     setFormData((prev) => ({ ...prev, [name]: value }));
@@ -180,7 +205,7 @@ const Evidencias = () => {
       setCropArea(null);
       cropAreaRef.current = null;
 
-      await cargarDatos();
+      paginacion.recargar();
     } catch (error) {
       console.error('Error al guardar evidencia:', error);
       setAlert({
@@ -221,7 +246,7 @@ const Evidencias = () => {
     setEvidenciaSeleccionada(null);
   };
 
-  if (loading) {
+  if (loading || (paginacion.loading && evidencias.length === 0)) {
     return (
       <Layout title="Evidencias">
         <div className="loading-container">
@@ -273,7 +298,8 @@ const Evidencias = () => {
               >
                 <div className="evidencia-image">
                   <img
-                    src={buildFileUrl(ev.archivo_url)}
+                    src={buildFileUrl(ev.archivo_variantes?.thumb || ev.archivo_url)}
+                    loading="lazy"
                     alt={ev.descripcion}
                     onError={(e) => {
                       e.currentTarget.src =
@@ -313,6 +339,7 @@ const Evidencias = () => {
             ))}
           </div>
         )}
+        <Paginador {...paginacion} />
 
         {/* Modal para subir evidencia */}
         {showModal && (
@@ -344,6 +371,16 @@ const Evidencias = () => {
                         </option>
                       ))}
                     </select>
+                    {cursorEstudiantes && (
+                      <button
+                        type="button"
+                        className="btn btn-outline btn-sm mt-1"
+                        onClick={cargarMasEstudiantes}
+                        disabled={cargandoEstudiantes}
+                      >
+                        {cargandoEstudiantes ? 'Cargando...' : 'Cargar más estudiantes'}
+                      </button>
+                    )}
                   </div>
 
                   <div className="form-group">
@@ -490,7 +527,7 @@ const Evidencias = () => {
                   }}
                 >
                   <img
-                    src={buildFileUrl(evidenciaSeleccionada.archivo_url)}
+                    src={buildFileUrl(evidenciaSeleccionada.archivo_variantes?.preview || evidenciaSeleccionada.archivo_url)}
                     alt={evidenciaSeleccionada.descripcion}
                     style={{ width: '100%', height: 'auto', display: 'block', maxHeight: '70vh', objectFit: 'contain' }}
                     onError={(e) => {
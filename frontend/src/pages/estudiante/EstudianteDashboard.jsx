@@ -2,12 +2,13 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { FileText, ClipboardList, Mail, User } from 'lucide-react';
 import Layout from '../../components/Layout';
-import api from '../../services/api';
+import { getPage, getTotales } from '../../services/api';
 import './EstudianteDashboard.css';
 
 const EstudianteDashboard = () => {
   const [solicitudes, setSolicitudes] = useState([]);
   const [mensajes, setMensajes] = useState([]);
+  const [conteos, setConteos] = useState({ total: 0, pendiente: 0, calificada: 0, noLeidos: 0 });
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -16,13 +17,24 @@ const EstudianteDashboard = () => {
 
   const cargarDatos = async () => {
     try {
-      const [solicitudesRes, mensajesRes] = await Promise.all([
-        api.get('/estudiante/solicitudes'),
-        api.get('/estudiante/mensajes')
+      // Solo las 5 más recientes de cada listado; los contadores salen de X-Total-Count
+      const [solicitudesRes, mensajesRes, porEstado] = await Promise.all([
+        getPage('/estudiante/solicitudes', { limit: 5, incluirTotal: true }),
+        getPage('/estudiante/mensajes', { limit: 5, params: { leido: false }, incluirTotal: true }),
+        getTotales('/estudiante/solicitudes', {
+          pendiente: { estado: 'pendiente' },
+          calificada: { estado: 'calificada' }
+        })
       ]);
 
       setSolicitudes(solicitudesRes.data);
-      setMensajes(mensajesRes.data.filter(m => !m.leido).slice(0, 5));
+      setMensajes(mensajesRes.data);
+      setConteos({
+        total: solicitudesRes.total ?? 0,
+        pendiente: porEstado.pendiente,
+        calificada: porEstado.calificada,
+        noLeidos: mensajesRes.total ?? 0
+      });
     } catch (error) {
       console.error('Error al cargar datos:', error);
     } finally {
@@ -70,23 +82,23 @@ const EstudianteDashboard = () => {
           {/* Resumen */}
           <div className="dashboard-stats">
             <div className="stat-card">
-              <div className="stat-number">{solicitudes.length}</div>
+              <div className="stat-number">{conteos.total}</div>
               <div className="stat-label">Total Solicitudes</div>
             </div>
             <div className="stat-card">
               <div className="stat-number">
-                {solicitudes.filter(s => s.estado === 'pendiente').length}
+                {conteos.pendiente}
               </div>
               <div className="stat-label">Pendientes</div>
             </div>
             <div className="stat-card">
               <div className="stat-number">
-                {solicitudes.filter(s => s.estado === 'calificada').length}
+                {conteos.calificada}
               </div>
               <div className="stat-label">Calificadas</div>
             </div>
             <div className="stat-card">
-              <div className="stat-number">{mensajes.length}</div>
+              <div className="stat-number">{conteos.noLeidos}</div>
               <div className="stat-label">Mensajes sin leer</div>
             </div>
           </div>
@@ -121,7 +133,7 @@ const EstudianteDashboard = () => {
               {solicitudes.length === 0 ? (
                 <p className="text-center text-gray">No tienes solicitudes aún</p>
               ) : (
-                solicitudes.slice(0, 5).map((sol) => (
+                solicitudes.map((sol) => (
                   <div key={sol.id} className="solicitud-item">
                     <div className="solicitud-info">
                       <h3>{sol.materia_nombre}</h3>
@@ -2,28 +2,36 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { ClipboardList, Plus, X, ArrowRight } from 'lucide-react';
 import Layout from '../../components/Layout';
-import api from '../../services/api';
+import Paginador, { usePaginacion } from '../../components/Paginador';
+import { getTotales } from '../../services/api';
 import './Solicitudes.css';
 
 const Solicitudes = () => {
-  const [solicitudes, setSolicitudes] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [filtro, setFiltro] = useState('todas');
+  const [conteos, setConteos] = useState({ todas: 0, pendiente: 0, aprobada: 0, calificada: 0 });
   const [showModal, setShowModal] = useState(false);
   const [solicitudSeleccionada, setSolicitudSeleccionada] = useState(null);
 
+  // El filtro de estado se aplica en el servidor; se muestra una página a la vez
+  const paginacion = usePaginacion('/estudiante/solicitudes', {
+    params: filtro === 'todas' ? {} : { estado: filtro }
+  });
+  const solicitudes = paginacion.items;
+
   useEffect(() => {
-    cargarSolicitudes();
+    cargarConteos();
   }, []);
 
-  const cargarSolicitudes = async () => {
+  const cargarConteos = async () => {
     try {
-      const response = await api.get('/estudiante/solicitudes');
-      setSolicitudes(response.data);
+      setConteos(await getTotales('/estudiante/solicitudes', {
+        todas: {},
+        pendiente: { estado: 'pendiente' },
+        aprobada: { estado: 'aprobada' },
+        calificada: { estado: 'calificada' }
+      }));
     } catch (error) {
       console.error('Error:', error);
-    } finally {
-      setLoading(false);
     }
   };
 
@@ -32,11 +40,6 @@ const Solicitudes = () => {
     setShowModal(true);
   };
 
-  const solicitudesFiltradas = solicitudes.filter(sol => {
-    if (filtro === 'todas') return true;
-    return sol.estado === filtro;
-  });
-
   const getEstadoBadge = (estado) => {
     const badges = {
       pendiente: 'badge-warning',
@@ -59,7 +62,7 @@ const Solicitudes = () => {
     return textos[estado] || estado;
   };
 
-  if (loading) {
+  if (paginacion.loading && solicitudes.length === 0) {
     return (
       <Layout title="Mis Solicitudes">
         <div className="text-center mt-4">
@@ -87,30 +90,30 @@ const Solicitudes = () => {
             className={`filtro-btn ${filtro === 'todas' ? 'active' : ''}`}
             onClick={() => setFiltro('todas')}
           >
-            Todas ({solicitudes.length})
+            Todas ({conteos.todas})
           </button>
           <button
             className={`filtro-btn ${filtro === 'pendiente' ? 'active' : ''}`}
             onClick={() => setFiltro('pendiente')}
           >
-            Pendientes ({solicitudes.filter(s => s.estado === 'pendiente').length})
+            Pendientes ({conteos.pendiente})
           </button>
           <button
             className={`filtro-btn ${filtro === 'aprobada' ? 'active' : ''}`}
             onClick={() => setFiltro('aprobada')}
           >
-            Aprobadas ({solicitudes.filter(s => s.estado === 'aprobada').length})
+            Aprobadas ({conteos.aprobada})
           </button>
           <button
             className={`filtro-btn ${filtro === 'calificada' ? 'active' : ''}`}
             onClick={() => setFiltro('calificada')}
           >
-            Calificadas ({solicitudes.filter(s => s.estado === 'calificada').length})
+            Calificadas ({conteos.calificada})
           </button>
         </div>
 
         <div className="solicitudes-grid">
-          {solicitudesFiltradas.length === 0 ? (
+          {solicitudes.length === 0 ? (
             <div className="empty-state">
               <p>No tienes solicitudes {filtro !== 'todas' ? `en estado "${getEstadoTexto(filtro)}"` : ''}</p>
               <Link to="/estudiante/nueva-solicitud" className="btn btn-primary">
@@ -118,7 +121,7 @@ const Solicitudes = () => {
               </Link>
             </div>
           ) : (
-            solicitudesFiltradas.map((sol) => (
+            solicitudes.map((sol) => (
               <div key={sol.id} className="solicitud-card">
                 <div className="solicitud-card-header">
                   <h3>{sol.materia_nombre}</h3>
@@ -147,6 +150,7 @@ const Solicitudes = () => {
             ))
           )}
         </div>
+        <Paginador {...paginacion} />
 
         {/* Modal de Detalles */}
         {showModal && solicitudSeleccionada && (
@@ -4,10 +4,12 @@ import Layout from '../../components/Layout';
 import AlertModal from '../../components/AlertModal';
 import ConfirmModal from '../../components/ConfirmModal';
 import api from '../../services/api';
+import Paginador, { usePaginacion } from '../../components/Paginador';
 import './GestionDocentes.css';
 
 const GestionDocentes = () => {
-  const [docentes, setDocentes] = useState([]);
+  const paginacion = usePaginacion('/subdecano/docentes');
+  const docentes = paginacion.items;
   const [materias, setMaterias] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showModal, setShowModal] = useState(false);
@@ -24,16 +26,13 @@ const GestionDocentes = () => {
   });
 
   useEffect(() => {
-    cargarDatos();
+    cargarMaterias();
   }, []);
 
-  const cargarDatos = async () => {
+  // La tabla se pagina con usePaginacion; aquí solo el catálogo de materias
+  const cargarMaterias = async () => {
     try {
-      const [docentesRes, materiasRes] = await Promise.all([
-        api.get('/subdecano/docentes'),
-        api.get('/subdecano/materias')
-      ]);
-      setDocentes(docentesRes.data);
+      const materiasRes = await api.get('/subdecano/materias');
       setMaterias(materiasRes.data);
     } catch (error) {
       console.error('Error:', error);
@@ -63,7 +62,7 @@ const GestionDocentes = () => {
         setShowModal(false);
       }
       resetForm();
-      cargarDatos();
+      paginacion.recargar();
     } catch (error) {
       console.error('Error:', error);
       setAlert({ show: true, type: 'error', title: 'Error', message: error.response?.data?.detail || 'Error al guardar docente' });
@@ -91,7 +90,7 @@ const GestionDocentes = () => {
         try {
           await api.put(`/subdecano/docentes/${id}/desactivar`);
           setAlert({ show: true, type: 'success', title: 'Éxito', message: 'Docente desactivado exitosamente' });
-          cargarDatos();
+          paginacion.recargar();
         } catch (error) {
           console.error('Error:', error);
           setAlert({ show: true, type: 'error', title: '❌ Error', message: 'Error al desactivar docente' });
@@ -110,7 +109,7 @@ const GestionDocentes = () => {
         try {
           await api.delete(`/subdecano/docentes/${id}`);
           setAlert({ show: true, type: 'success', title: 'Éxito', message: 'Docente eliminado permanentemente' });
-          cargarDatos();
+          paginacion.recargar();
         } catch (error) {
           console.error('Error:', error);
           setAlert({ show: true, type: 'error', title: '❌ Error', message: 'Error al eliminar docente' });
@@ -148,7 +147,7 @@ const GestionDocentes = () => {
     setAlert({ show: true, type: 'info', title: 'Copiar', message: 'Contraseña copiada al portapapeles' });
   };
 
-  if (loading) {
+  if (loading || (paginacion.loading && docentes.length === 0)) {
     return (
       <Layout title="Gestión de Docentes">
         <div className="text-center mt-4"><span className="loading"></span></div>
@@ -225,6 +224,7 @@ const GestionDocentes = () => {
             </tbody>
           </table>
         </div>
+        <Paginador {...paginacion} />
 
         {/* Modal de Formulario */}
         {showModal && (
@@ -4,10 +4,12 @@ import Layout from '../../components/Layout';
 import AlertModal from '../../components/AlertModal';
 import ConfirmModal from '../../components/ConfirmModal';
 import api from '../../services/api';
+import Paginador, { usePaginacion } from '../../components/Paginador';
 import './GestionDocentes.css'; // Reutilizamos los estilos
 
 const GestionEstudiantes = () => {
-  const [estudiantes, setEstudiantes] = useState([]);
+  const paginacion = usePaginacion('/subdecano/estudiantes');
+  const estudiantes = paginacion.items;
   const [materias, setMaterias] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showModal, setShowModal] = useState(false);
@@ -24,16 +26,13 @@ const GestionEstudiantes = () => {
   });
 
   useEffect(() => {
-    cargarDatos();
+    cargarMaterias();
   }, []);
 
-  const cargarDatos = async () => {
+  // La tabla se pagina con usePaginacion; aquí solo el catálogo de materias
+  const cargarMaterias = async () => {
     try {
-      const [estudiantesRes, materiasRes] = await Promise.all([
-        api.get('/subdecano/estudiantes'),
-        api.get('/subdecano/materias')
-      ]);
-      setEstudiantes(estudiantesRes.data);
+      const materiasRes = await api.get('/subdecano/materias');
       setMaterias(materiasRes.data);
     } catch (error) {
       console.error('Error:', error);
@@ -63,7 +62,7 @@ const GestionEstudiantes = () => {
         setShowModal(false);
       }
       resetForm();
-      cargarDatos();
+      paginacion.recargar();
     } catch (error) {
       console.error('Error:', error);
       setAlert({ show: true, type: 'error', title: 'Error', message: error.response?.data?.detail || 'Error al guardar estudiante' });
@@ -91,7 +90,7 @@ const GestionEstudiantes = () => {
         try {
           await api.put(`/subdecano/estudiantes/${id}/desactivar`);
           setAlert({ show: true, type: 'success', title: 'Éxito', message: 'Estudiante desactivado exitosamente' });
-          cargarDatos();
+          paginacion.recargar();
         } catch (error) {
           console.error('Error:', error);
           setAlert({ show: true, type: 'error', title: '❌ Error', message: 'Error al desactivar estudiante' });
@@ -110,7 +109,7 @@ const GestionEstudiantes = () => {
         try {
           await api.delete(`/subdecano/estudiantes/${id}`);
           setAlert({ show: true, type: 'success', title: 'Éxito', message: 'Estudiante eliminado permanentemente' });
-          cargarDatos();
+          paginacion.recargar();
         } catch (error) {
           console.error('Error:', error);
           setAlert({ show: true, type: 'error', title: '❌ Error', message: 'Error al eliminar estudiante' });
@@ -148,7 +147,7 @@ const GestionEstudiantes = () => {
     setAlert({ show: true, type: 'info', title: 'Copiar', message: 'Contraseña copiada al portapapeles' });
   };
 
-  if (loading) {
+  if (loading || (paginacion.loading && estudiantes.length === 0)) {
     return (
       <Layout title="Gestión de Estudiantes">
         <div className="text-center mt-4"><span className="loading"></span></div>
@@ -225,6 +224,7 @@ const GestionEstudiantes = () => {
             </tbody>
           </table>
         </div>
+        <Paginador {...paginacion} />
 
         {/* Modal de Formulario */}
         {showModal && (
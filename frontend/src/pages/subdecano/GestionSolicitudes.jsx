@@ -4,28 +4,36 @@ import { Link } from 'react-router-dom';
 import Layout from '../../components/Layout';
 import AlertModal from '../../components/AlertModal';
 import ConfirmModal from '../../components/ConfirmModal';
-import api from '../../services/api';
+import api, { getTotales } from '../../services/api';
+import Paginador, { usePaginacion } from '../../components/Paginador';
 import './GestionSolicitudes.css';
 
 const GestionSolicitudes = () => {
-  const [solicitudes, setSolicitudes] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [filtro, setFiltro] = useState('pendiente');
+  const [conteos, setConteos] = useState({ pendiente: 0, aprobada: 0, rechazada: 0, todas: 0 });
   const [alert, setAlert] = useState({ show: false, type: 'info', title: '', message: '' });
   const [confirm, setConfirm] = useState({ show: false, title: '', message: '', action: null, type: 'warning' });
 
+  // El filtro de estado se aplica en el servidor; la tabla muestra una página a la vez
+  const paginacion = usePaginacion('/subdecano/solicitudes', {
+    params: filtro === 'todas' ? {} : { estado: filtro }
+  });
+  const solicitudes = paginacion.items;
+
   useEffect(() => {
-    cargarSolicitudes();
+    cargarConteos();
   }, []);
 
-  const cargarSolicitudes = async () => {
+  const cargarConteos = async () => {
     try {
-      const response = await api.get('/subdecano/solicitudes');
-      setSolicitudes(response.data);
+      setConteos(await getTotales('/subdecano/solicitudes', {
+        pendiente: { estado: 'pendiente' },
+        aprobada: { estado: 'aprobada' },
+        rechazada: { estado: 'rechazada' },
+        todas: {}
+      }));
     } catch (error) {
       console.error('Error:', error);
-    } finally {
-      setLoading(false);
     }
   };
 
@@ -48,7 +56,8 @@ const GestionSolicitudes = () => {
             setAlert({ show: true, type: 'success', title: 'Éxito', message: 'Solicitud rechazada exitosamente' });
           }
 
-          cargarSolicitudes();
+          paginacion.recargar();
+          cargarConteos();
         } catch (error) {
           console.error('Error:', error);
           setAlert({ show: true, type: 'error', title: 'Error', message: error.response?.data?.detail || 'Error al actualizar solicitud' });
@@ -59,11 +68,6 @@ const GestionSolicitudes = () => {
     });
   };
 
-  const solicitudesFiltradas = solicitudes.filter(sol => {
-    if (filtro === 'todas') return true;
-    return sol.estado === filtro;
-  });
-
   const getEstadoBadge = (estado) => {
     const badges = {
       pendiente: 'badge-warning',
@@ -73,7 +77,7 @@ const GestionSolicitudes = () => {
     return badges[estado] || 'badge-info';
   };
 
-  if (loading) {
+  if (paginacion.loading && solicitudes.length === 0) {
     return (
       <Layout title="Gestión de Solicitudes">
         <div className="text-center mt-4">
@@ -111,25 +115,25 @@ const GestionSolicitudes = () => {
             className={`filtro-btn ${filtro === 'pendiente' ? 'active' : ''}`}
             onClick={() => setFiltro('pendiente')}
           >
-            Pendientes ({solicitudes.filter(s => s.estado === 'pendiente').length})
+            Pendientes ({conteos.pendiente})
           </button>
           <button
             className={`filtro-btn ${filtro === 'aprobada' ? 'active' : ''}`}
             onClick={() => setFiltro('aprobada')}
           >
-            Aprobadas ({solicitudes.filter(s => s.estado === 'aprobada').length})
+            Aprobadas ({conteos.aprobada})
           </button>
           <button
             className={`filtro-btn ${filtro === 'rechazada' ? 'active' : ''}`}
             onClick={() => setFiltro('rechazada')}
           >
-            Rechazadas ({solicitudes.filter(s => s.estado === 'rechazada').length})
+            Rechazadas ({conteos.rechazada})
           </button>
           <button
             className={`filtro-btn ${filtro === 'todas' ? 'active' : ''}`}
             onClick={() => setFiltro('todas')}
           >
-            Todas ({solicitudes.length})
+            Todas ({conteos.todas})
           </button>
         </div>
 
@@ -149,14 +153,14 @@ const GestionSolicitudes = () => {
               </tr>
             </thead>
             <tbody>
-              {solicitudesFiltradas.length === 0 ? (
+              {solicitudes.length === 0 ? (
                 <tr>
                   <td colSpan="9" className="text-center">
                     No hay solicitudes {filtro !== 'todas' ? `en estado "${filtro}"` : ''}
                   </td>
                 </tr>
               ) : (
-                solicitudesFiltradas.map((sol) => (
+                solicitudes.map((sol) => (
                   <tr key={sol.id}>
                     <td>{sol.estudiante_nombre_anonimo}</td>
                     <td>{sol.materia_nombre}</td>
@@ -196,6 +200,8 @@ const GestionSolicitudes = () => {
             </tbody>
           </table>
         </div>
+
+        <Paginador {...paginacion} />
       </div>
     </Layout>
   );
@@ -3,35 +3,41 @@ import { KeyRound, GraduationCap, Users, CheckCircle, XCircle, RefreshCw, Clipbo
 import Layout from '../../components/Layout';
 import AlertModal from '../../components/AlertModal';
 import ConfirmModal from '../../components/ConfirmModal';
-import api from '../../services/api';
+import Paginador, { usePaginacion } from '../../components/Paginador';
+import api, { getTotal } from '../../services/api';
 import './GestionDocentes.css'; // Reutilizamos estilos
 
+const URL_SOLICITUDES = '/subdecano/solicitudes-reset-password';
+
 const SolicitudesResetPassword = () => {
-  const [solicitudes, setSolicitudes] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const paginacion = usePaginacion(URL_SOLICITUDES);
+  const solicitudes = paginacion.items;
+  const [pendientes, setPendientes] = useState(0);
   const [alert, setAlert] = useState({ show: false, type: 'info', title: '', message: '' });
   const [confirm, setConfirm] = useState({ show: false, title: '', message: '', action: null });
   const [showPasswordModal, setShowPasswordModal] = useState(false);
   const [passwordData, setPasswordData] = useState(null);
 
   useEffect(() => {
-    cargarSolicitudes();
+    cargarPendientes();
   }, []);
 
-  const cargarSolicitudes = async () => {
-    try {
-      const res = await api.get('/subdecano/solicitudes-reset-password');
-      setSolicitudes(res.data);
-    } catch (error) {
-      console.error('Error:', error);
+  useEffect(() => {
+    if (paginacion.error) {
       setAlert({
         show: true,
         type: 'error',
         title: '❌ Error',
         message: 'Error al cargar solicitudes'
       });
-    } finally {
-      setLoading(false);
+    }
+  }, [paginacion.error]);
+
+  const cargarPendientes = async () => {
+    try {
+      setPendientes(await getTotal(URL_SOLICITUDES, { estado: 'pendiente' }));
+    } catch (error) {
+      console.error('Error:', error);
     }
   };
 
@@ -51,8 +57,9 @@ const SolicitudesResetPassword = () => {
           });
           setShowPasswordModal(true);
 
-          // Recargar lista
-          setTimeout(() => cargarSolicitudes(), 1000);
+          // Recargar la página actual y el contador
+          paginacion.recargar();
+          cargarPendientes();
         } catch (error) {
           console.error('Error:', error);
           setAlert({
@@ -78,7 +85,7 @@ const SolicitudesResetPassword = () => {
     }
   };
 
-  if (loading) {
+  if (paginacion.loading && solicitudes.length === 0) {
     return (
       <Layout title="Solicitudes de Reset de Contraseña">
         <div className="text-center mt-4"><span className="loading"></span></div>
@@ -111,7 +118,7 @@ const SolicitudesResetPassword = () => {
         <div className="gestion-header">
           <h2><KeyRound className="inline-block mr-2" size={24} /> Solicitudes de Reset de Contraseña</h2>
           <div className="badge badge-info">
-            {solicitudes.filter(s => s.estado === 'pendiente').length} Pendientes
+            {pendientes} Pendientes
           </div>
         </div>
 
@@ -188,6 +195,7 @@ const SolicitudesResetPassword = () => {
             </tbody>
           </table>
         </div>
+        <Paginador {...paginacion} />
 
         {/* Modal de Contraseña Temporal */}
         {showPasswordModal && passwordData && (
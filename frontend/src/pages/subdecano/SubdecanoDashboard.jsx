@@ -2,12 +2,11 @@ import React, { useState, useEffect } from 'react';
 import { ClipboardList, KeyRound, GraduationCap, Users, BookOpen } from 'lucide-react';
 import { Link } from 'react-router-dom';
 import Layout from '../../components/Layout';
-import api from '../../services/api';
+import { getPage, getTotal } from '../../services/api';
 
 const SubdecanoDashboard = () => {
-  const [solicitudes, setSolicitudes] = useState([]);
-  const [docentes, setDocentes] = useState([]);
-  const [estudiantes, setEstudiantes] = useState([]);
+  const [pendientes, setPendientes] = useState([]);
+  const [conteos, setConteos] = useState({ pendientes: 0, docentes: 0, estudiantes: 0, solicitudes: 0 });
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -16,15 +15,16 @@ const SubdecanoDashboard = () => {
 
   const cargarDatos = async () => {
     try {
-      const [solicitudesRes, docentesRes, estudiantesRes] = await Promise.all([
-        api.get('/subdecano/solicitudes'),
-        api.get('/subdecano/docentes'),
-        api.get('/subdecano/estudiantes')
+      // Solo las 5 pendientes más recientes; los contadores salen de X-Total-Count
+      const [pendientesRes, docentes, estudiantes, solicitudes] = await Promise.all([
+        getPage('/subdecano/solicitudes', { limit: 5, params: { estado: 'pendiente' }, incluirTotal: true }),
+        getTotal('/subdecano/docentes'),
+        getTotal('/subdecano/estudiantes'),
+        getTotal('/subdecano/solicitudes')
       ]);
 
-      setSolicitudes(solicitudesRes.data);
-      setDocentes(docentesRes.data);
-      setEstudiantes(estudiantesRes.data);
+      setPendientes(pendientesRes.data);
+      setConteos({ pendientes: pendientesRes.total ?? 0, docentes, estudiantes, solicitudes });
     } catch (error) {
       console.error('Error al cargar datos:', error);
     } finally {
@@ -62,20 +62,20 @@ const SubdecanoDashboard = () => {
           <div className="dashboard-stats">
             <div className="stat-card">
               <div className="stat-number">
-                {solicitudes.filter(s => s.estado === 'pendiente').length}
+                {conteos.pendientes}
               </div>
               <div className="stat-label">Solicitudes Pendientes</div>
             </div>
             <div className="stat-card">
-              <div className="stat-number">{docentes.length}</div>
+              <div className="stat-number">{conteos.docentes}</div>
               <div className="stat-label">Docentes</div>
             </div>
             <div className="stat-card">
-              <div className="stat-number">{estudiantes.length}</div>
+              <div className="stat-number">{conteos.estudiantes}</div>
               <div className="stat-label">Estudiantes</div>
             </div>
             <div className="stat-card">
-              <div className="stat-number">{solicitudes.length}</div>
+              <div className="stat-number">{conteos.solicitudes}</div>
               <div className="stat-label">Total Solicitudes</div>
             </div>
           </div>
@@ -113,42 +113,39 @@ const SubdecanoDashboard = () => {
               <h2 className="card-title">Solicitudes Pendientes de Aprobación</h2>
             </div>
             <div className="solicitudes-list">
-              {solicitudes.filter(s => s.estado === 'pendiente').length === 0 ? (
+              {pendientes.length === 0 ? (
                 <p className="text-center text-gray">No hay solicitudes pendientes</p>
               ) : (
-                solicitudes
-                  .filter(s => s.estado === 'pendiente')
-                  .slice(0, 5)
-                  .map((sol) => (
-                    <div key={sol.id} className="solicitud-item">
-                      <div className="solicitud-info">
-                        <h3>{sol.materia_nombre}</h3>
-                        <p className="text-gray">
-                          Estudiante: {sol.estudiante_nombre_anonimo}
-                        </p>
-                        <p className="text-sm text-gray">
-                          Grupo: {sol.grupo} | Aporte: {sol.aporte}
-                        </p>
-                        <p className="text-sm text-gray">
-                          {new Date(sol.fecha_creacion).toLocaleDateString('es-ES')}
-                        </p>
-                      </div>
-                      <div className="solicitud-actions">
-                        <span className={`badge ${getEstadoBadge(sol.estado)}`}>
-                          {sol.estado}
-                        </span>
-                        <Link
-                          to="/subdecano/solicitudes"
-                          className="btn btn-secondary"
-                        >
-                          Gestionar
-                        </Link>
-                      </div>
+                pendientes.map((sol) => (
+                  <div key={sol.id} className="solicitud-item">
+                    <div className="solicitud-info">
+                      <h3>{sol.materia_nombre}</h3>
+                      <p className="text-gray">
+                        Estudiante: {sol.estudiante_nombre_anonimo}
+                      </p>
+                      <p className="text-sm text-gray">
+                        Grupo: {sol.grupo} | Aporte: {sol.aporte}
+                      </p>
+                      <p className="text-sm text-gray">
+                        {new Date(sol.fecha_creacion).toLocaleDateString('es-ES')}
+                      </p>
                     </div>
-                  ))
+                    <div className="solicitud-actions">
+                      <span className={`badge ${getEstadoBadge(sol.estado)}`}>
+                        {sol.estado}
+                      </span>
+                      <Link
+                        to="/subdecano/solicitudes"
+                        className="btn btn-secondary"
+                      >
+                        Gestionar
+                      </Link>
+                    </div>
+                  </div>
+                ))
               )}
             </div>
-            {solicitudes.filter(s => s.estado === 'pendiente').length > 5 && (
+            {conteos.pendientes > 5 && (
               <div className="text-center mt-3">
                 <Link to="/subdecano/solicitudes" className="btn btn-outline">
                   Ver todas las solicitudes
@@ -8,10 +8,38 @@ const api = axios.create({
   }
 });
 
+// Renovación de sesión con el refresh token (cookie HttpOnly en /api/auth).
+// Varias peticiones que fallen a la vez comparten una sola llamada a /auth/refresh.
+let refreshPromise = null;
+const refreshSession = () => {
+  if (!refreshPromise) {
+    refreshPromise = api.post('/auth/refresh').finally(() => {
+      refreshPromise = null;
+    });
+  }
+  return refreshPromise;
+};
+
+const AUTH_PATHS_SIN_REFRESH = ['/auth/login', '/auth/refresh', '/auth/logout'];
+
 // Interceptor para manejar errores de autenticación
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const original = error.config;
+    const puedeRenovar = original && !original._reintento
+      && !AUTH_PATHS_SIN_REFRESH.some((path) => original.url?.includes(path));
+
+    if (error.response?.status === 401 && puedeRenovar) {
+      original._reintento = true;
+      try {
+        await refreshSession();
+        return api(original);
+      } catch {
+        // El refresh falló: se sigue con el flujo normal de 401
+      }
+    }
+
     if (error.response?.status === 401) {
       // ✅ No hay nada que limpiar aquí
       // El servidor ya borra la HttpOnly cookie automáticamente
@@ -26,5 +54,37 @@ api.interceptors.response.use(
   }
 );
 
+// Una página de un listado paginado por cursor (header X-Next-Cursor).
+// Retorna { data, nextCursor, total }; total solo viene si se pide incluirTotal.
+export const getPage = async (url, { cursor = null, limit, params = {}, incluirTotal = false } = {}) => {
+  const response = await api.get(url, {
+    params: {
+      ...params,
+      ...(cursor ? { cursor } : {}),
+      ...(limit ? { limit } : {}),
+      ...(incluirTotal ? { incluir_total: true } : {})
+    }
+  });
+  const total = response.headers['x-total-count'];
+  return {
+    data: response.data,
+    nextCursor: response.headers['x-next-cursor'] || null,
+    total: total !== undefined ? Number(total) : null
+  };
+};
+
+// Solo el total de un listado (X-Total-Count), sin traer las filas
+export const getTotal = async (url, params = {}) => {
+  const { total } = await getPage(url, { limit: 1, params, incluirTotal: true });
+  return total ?? 0;
+};
+
+// Varios totales del mismo listado en paralelo: { clave: params } -> { clave: total }
+export const getTotales = async (url, filtros) => {
+  const claves = Object.keys(filtros);
+  const totales = await Promise.all(claves.map((clave) => getTotal(url, filtros[clave])));
+  return Object.fromEntries(claves.map((clave, i) => [clave, totales[i]]));
+};
+
 export default api;
 
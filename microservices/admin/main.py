@@ -1,6 +1,10 @@
+import asyncio
 from common.app_factory import create_app
 from routers import subdecano
 from seed_db import seed_data
+from migrate_ids import migrate_reference_ids
+from common.database import identidades_collection
+from common.utils.identity import rebuild_identity_directory
 
 app, limiter = create_app(
     title="Admin Service",
@@ -10,6 +14,26 @@ app, limiter = create_app(
 @app.on_event("startup")
 async def startup_event():
     await seed_data()
+    # Primer arranque con el directorio de identidades: se construye desde las colecciones de usuarios
+    # (seed_data ya registró al subdecano, por eso se compara contra 1)
+    if await identidades_collection.count_documents({}, limit=2) <= 1:
+        await rebuild_identity_directory()
+    # Migración en línea: corre en segundo plano mientras el servicio atiende peticiones
+    app.state.migracion_ids = asyncio.create_task(migrate_reference_ids())
+
+async def stop_migration_event():
+    """Cancela la migración en curso; se reanuda en el próximo arranque"""
+    tarea = getattr(app.state, "migracion_ids", None)
+    if tarea is None or tarea.done():
+        return
+    tarea.cancel()
+    try:
+        await tarea
+    except asyncio.CancelledError:
+        pass
+
+# Primero en el apagado: la migración debe detenerse antes de que close_db cierre el cliente
+app.router.on_shutdown.insert(0, stop_migration_event)
 
 app.include_router(subdecano.router)
 
@@ -0,0 +1,88 @@
+import asyncio
+from pymongo import UpdateOne
+from common.database import (
+    docentes_collection,
+    estudiantes_collection,
+    evidencias_collection,
+    solicitudes_collection,
+    mensajes_collection,
+    calificaciones_collection
+)
+
+BATCH_SIZE = 500
+
+# Campos de referencia escalares que deben guardarse como string
+SCALAR_FIELDS = [
+    (evidencias_collection, ["materia_id", "docente_id", "estudiante_id"]),
+    (solicitudes_collection, ["materia_id", "docente_id", "estudiante_id", "docente_recalificador_id"]),
+    (mensajes_collection, ["destinatario_id"]),
+    (calificaciones_collection, ["docente_id"]),
+]
+
+# Campos de referencia tipo lista
+ARRAY_FIELDS = [
+    (docentes_collection, "materias"),
+    (estudiantes_collection, "materias_cursando"),
+]
+
+async def _flush(collection, operaciones) -> int:
+    if not operaciones:
+        return 0
+    result = await collection.bulk_write(operaciones, ordered=False)
+    # Ceder el loop entre lotes para no competir con las peticiones en curso
+    await asyncio.sleep(0)
+    return result.modified_count
+
+async def _migrar_escalar(collection, field) -> int:
+    """Reescribe en lotes los documentos cuyo campo es ObjectId"""
+    modificados = 0
+    operaciones = []
+    cursor = collection.find({field: {"$type": "objectId"}}, {field: 1}).batch_size(BATCH_SIZE)
+    async for doc in cursor:
+        # El filtro incluye el valor anterior para no pisar escrituras concurrentes
+        operaciones.append(UpdateOne(
+            {"_id": doc["_id"], field: doc[field]},
+            {"$set": {field: str(doc[field])}}
+        ))
+        if len(operaciones) >= BATCH_SIZE:
+            modificados += await _flush(collection, operaciones)
+            operaciones = []
+    modificados += await _flush(collection, operaciones)
+    return modificados
+
+async def _migrar_lista(collection, field) -> int:
+    """Reescribe en lotes las listas que contienen algún ObjectId"""
+    modificados = 0
+    operaciones = []
+    cursor = collection.find({field: {"$elemMatch": {"$type": "objectId"}}}, {field: 1}).batch_size(BATCH_SIZE)
+    async for doc in cursor:
+        operaciones.append(UpdateOne(
+            {"_id": doc["_id"], field: doc[field]},
+            {"$set": {field: [str(v) for v in doc[field]]}}
+        ))
+        if len(operaciones) >= BATCH_SIZE:
+            modificados += await _flush(collection, operaciones)
+            operaciones = []
+    modificados += await _flush(collection, operaciones)
+    return modificados
+
+async def migrate_reference_ids():
+    """Normaliza todas las referencias a su forma canónica (string). Es idempotente."""
+    print("🔁 Normalizando referencias de IDs...")
+    total = 0
+    for collection, fields in SCALAR_FIELDS:
+        for field in fields:
+            modificados = await _migrar_escalar(collection, field)
+            if modificados:
+                print(f"   ✅ {collection.name}.{field}: {modificados} documento(s)")
+            total += modificados
+    for collection, field in ARRAY_FIELDS:
+        modificados = await _migrar_lista(collection, field)
+        if modificados:
+            print(f"   ✅ {collection.name}.{field}: {modificados} documento(s)")
+        total += modificados
+    print(f"🏁 Normalización de IDs completada ({total} documento(s) actualizados)")
+    return total
+
+if __name__ == "__main__":
+    asyncio.run(migrate_reference_ids())
@@ -0,0 +1,5 @@
+import asyncio
+from common.utils.identity import rebuild_identity_directory
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_identity_directory())
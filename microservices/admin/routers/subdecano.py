@@ -1,20 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Dict
+import asyncio
+import uuid
+from fastapi import APIRouter, HTTPException, Depends, status, Response
+from typing import List, Dict, Literal, Optional
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
 from common.models.schemas import (
     DocenteCreate, DocenteUpdate, DocenteResponse,
     EstudianteCreate, EstudianteResponse,
     SolicitudResponse, SolicitudUpdateEstado, EstadoSolicitud,
     MateriaCreate, MateriaResponse,
-    DocenteCreateBySubdecano, EstudianteCreateBySubdecano
+    DocenteCreateBySubdecano, EstudianteCreateBySubdecano,
+    DOCENTE_LISTADO_FIELDS, ESTUDIANTE_LISTADO_FIELDS, SOLICITUD_LISTADO_FIELDS,
+    SOLICITUD_RESET_LISTADO_FIELDS, LOG_LISTADO_FIELDS, GenerarResetLote
 )
 from common.database import (
     docentes_collection, estudiantes_collection, subdecanos_collection,
     solicitudes_collection, materias_collection, mensajes_collection
 )
 from common.utils.auth import get_current_user
-from common.utils.encryption import hash_password, anonymize_name
+from common.utils.encryption import hash_password_async, anonymize_name
+from common.utils.ids import normalize_id, normalize_ids, id_filter, to_db_id, to_db_ids
+from common.utils.loader import Loaders, get_loaders
+from common.utils.catalog import materias_catalog
+from common.utils.pagination import PageParams, paginate
+from common.utils.queries import find_projected
+from common.utils.export import export_response
+from common.utils.identity import (
+    upsert_identity, set_identity_active, remove_identity, ROLE_COLLECTIONS, IdentityConflictError
+)
 
 router = APIRouter(prefix="/api/subdecano", tags=["Subdecano"])
 
@@ -47,16 +61,25 @@ async def crear_docente(
         "_id": docente_id,
         "email": docente.email,
         "nombre": docente.nombre,
-        "password": hash_password(password_default),
+        "password": await hash_password_async(password_default),
         "rol": "docente",
         "carrera": docente.carrera,
-        "materias": docente.materias,
+        "materias": normalize_ids(docente.materias),
         "activo": True,
         "primer_login": True,  # Debe cambiar contraseña en primer login
         "fecha_registro": datetime.utcnow()
     }
     
-    await docentes_collection.insert_one(nuevo_docente)
+    # La identidad se registra primero: rechaza el email si ya pertenece a otro rol
+    try:
+        await upsert_identity(docente.email, "docente", docente_id)
+    except IdentityConflictError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El email ya está registrado con otro rol")
+    try:
+        await docentes_collection.insert_one(nuevo_docente)
+    except Exception:
+        await remove_identity("docente", docente_id)
+        raise
     
     return {
         "id": docente_id,
@@ -69,12 +92,16 @@ async def crear_docente(
     }
 
 @router.get("/docentes")
-async def listar_docentes(current_user: Dict = Depends(get_current_user)):
-    """Lista todos los docentes"""
+async def listar_docentes(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Lista los docentes (paginado por cursor)"""
     if current_user["role"] != "subdecano":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    docentes = await docentes_collection.find().to_list(length=1000)
+    docentes = await paginate(docentes_collection, {}, page, response, DOCENTE_LISTADO_FIELDS)
     
     return [
         {
@@ -103,7 +130,7 @@ async def actualizar_docente(
     update_data = {
         "nombre": datos.nombre,
         "carrera": datos.carrera,
-        "materias": datos.materias
+        "materias": normalize_ids(datos.materias)
     }
     
     result = await docentes_collection.update_one(
@@ -133,6 +160,8 @@ async def desactivar_docente(
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Docente no encontrado")
     
+    await set_identity_active("docente", docente_id, False)
+    
     return {"message": "Docente desactivado exitosamente"}
 
 @router.delete("/docentes/{docente_id}")
@@ -149,6 +178,8 @@ async def eliminar_docente(
     if result.deleted_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Docente no encontrado")
     
+    await remove_identity("docente", docente_id)
+    
     return {"message": "Docente eliminado permanentemente"}
 
 # =============== GESTIÓN DE ESTUDIANTES ===============
@@ -179,16 +210,25 @@ async def crear_estudiante(
         "_id": estudiante_id,
         "email": estudiante.email,
         "nombre": estudiante.nombre,
-        "password": hash_password(password_default),
+        "password": await hash_password_async(password_default),
         "rol": "estudiante",
         "carrera": estudiante.carrera,
-        "materias_cursando": estudiante.materias_cursando,
+        "materias_cursando": normalize_ids(estudiante.materias_cursando),
         "activo": True,
         "primer_login": True,  # Debe cambiar contraseña en primer login
         "fecha_registro": datetime.utcnow()
     }
     
-    await estudiantes_collection.insert_one(nuevo_estudiante)
+    # La identidad se registra primero: rechaza el email si ya pertenece a otro rol
+    try:
+        await upsert_identity(estudiante.email, "estudiante", estudiante_id)
+    except IdentityConflictError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El email ya está registrado con otro rol")
+    try:
+        await estudiantes_collection.insert_one(nuevo_estudiante)
+    except Exception:
+        await remove_identity("estudiante", estudiante_id)
+        raise
     
     return {
         "id": estudiante_id,
@@ -201,12 +241,16 @@ async def crear_estudiante(
     }
 
 @router.get("/estudiantes")
-async def listar_estudiantes(current_user: Dict = Depends(get_current_user)):
-    """Lista todos los estudiantes"""
+async def listar_estudiantes(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Lista los estudiantes (paginado por cursor)"""
     if current_user["role"] != "subdecano":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    estudiantes = await estudiantes_collection.find().to_list(length=1000)
+    estudiantes = await paginate(estudiantes_collection, {}, page, response, ESTUDIANTE_LISTADO_FIELDS)
     
     return [
         {
@@ -235,7 +279,7 @@ async def actualizar_estudiante(
     update_data = {
         "nombre": datos.nombre,
         "carrera": datos.carrera,
-        "materias_cursando": datos.materias_cursando
+        "materias_cursando": normalize_ids(datos.materias_cursando)
     }
     
     result = await estudiantes_collection.update_one(
@@ -265,6 +309,8 @@ async def desactivar_estudiante(
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estudiante no encontrado")
     
+    await set_identity_active("estudiante", estudiante_id, False)
+    
     return {"message": "Estudiante desactivado exitosamente"}
 
 @router.delete("/estudiantes/{estudiante_id}")
@@ -281,22 +327,36 @@ async def eliminar_estudiante(
     if result.deleted_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estudiante no encontrado")
     
+    await remove_identity("estudiante", estudiante_id)
+    
     return {"message": "Estudiante eliminado permanentemente"}
 
 # =============== GESTIÓN DE SOLICITUDES ===============
 
 @router.get("/solicitudes", response_model=List[SolicitudResponse])
-async def listar_solicitudes(current_user: Dict = Depends(get_current_user)):
-    """Lista todas las solicitudes con datos anonimizados"""
+async def listar_solicitudes(
+    response: Response,
+    estado: Optional[EstadoSolicitud] = None,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user),
+    loaders: Loaders = Depends(get_loaders)
+):
+    """Lista las solicitudes con datos anonimizados, opcionalmente por estado (paginado por cursor)"""
     if current_user["role"] != "subdecano":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    solicitudes = await solicitudes_collection.find().sort("fecha_creacion", -1).to_list(length=1000)
+    query = {"estado": estado.value} if estado else {}
+    solicitudes = await paginate(
+        solicitudes_collection, query, page, response, SOLICITUD_LISTADO_FIELDS,
+        sort_field="fecha_creacion", direction=-1
+    )
+    
+    # Resolver todas las materias referenciadas en una sola consulta
+    materias = await loaders.materias.load_many(sol["materia_id"] for sol in solicitudes)
     
     resultado = []
     for sol in solicitudes:
-        materia = await materias_collection.find_one({"_id": sol["materia_id"]})
-        docente = await docentes_collection.find_one({"_id": sol["docente_id"]})
+        materia = materias.get(normalize_id(sol["materia_id"]))
         
         resultado.append(SolicitudResponse(
             id=str(sol["_id"]),
@@ -435,6 +495,7 @@ async def crear_materia(
     }
     
     result = await materias_collection.insert_one(nueva_materia)
+    await materias_catalog.invalidate()
     
     return MateriaResponse(
         id=str(result.inserted_id),
@@ -470,7 +531,7 @@ async def obtener_materia(
     if current_user["role"] != "subdecano":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    materia = await materias_collection.find_one({"_id": ObjectId(materia_id)})
+    materia = await materias_collection.find_one(id_filter(materia_id))
     if not materia:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Materia no encontrada")
     
@@ -491,7 +552,7 @@ async def actualizar_materia(
     if current_user["role"] != "subdecano":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    materia = await materias_collection.find_one({"_id": ObjectId(materia_id)})
+    materia = await materias_collection.find_one(id_filter(materia_id))
     if not materia:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Materia no encontrada")
     
@@ -507,13 +568,15 @@ async def actualizar_materia(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Debe proporcionar datos para actualizar")
     
     result = await materias_collection.update_one(
-        {"_id": ObjectId(materia_id)},
+        id_filter(materia_id),
         {"$set": update_data}
     )
     
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Materia no encontrada")
     
+    await materias_catalog.invalidate()
+    
     return {"message": "Materia actualizada exitosamente"}
 
 @router.delete("/materias/{materia_id}")
@@ -533,11 +596,13 @@ async def eliminar_materia(
             detail=f"No se puede eliminar. Tiene {solicitudes_count} solicitud(es) asociada(s)"
         )
     
-    result = await materias_collection.delete_one({"_id": ObjectId(materia_id)})
+    result = await materias_collection.delete_one(id_filter(materia_id))
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Materia no encontrada")
     
+    await materias_catalog.invalidate()
+    
     return {"message": "Materia eliminada exitosamente"}
 
 # =============== ASIGNACIÓN DE DOCENTES RECALIFICADORES ===============
@@ -545,7 +610,8 @@ async def eliminar_materia(
 @router.get("/solicitudes/{solicitud_id}/docentes-disponibles")
 async def obtener_docentes_disponibles(
     solicitud_id: str,
-    current_user: Dict = Depends(get_current_user)
+    current_user: Dict = Depends(get_current_user),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Obtiene lista de TODOS los docentes de la carrera (excluyendo el docente original)"""
     if current_user["role"] != "subdecano":
@@ -573,18 +639,19 @@ async def obtener_docentes_disponibles(
     
     print(f"   👥 Docentes disponibles en la carrera: {len(docentes)}")
     
+    # Resolver las materias de todos los docentes en una sola consulta
+    materias = await loaders.materias.load_many(
+        materia_id for doc in docentes for materia_id in doc.get("materias", [])
+    )
+    
     resultado = []
     for doc in docentes:
         # Obtener nombres de las materias asignadas
         materias_nombres = []
-        if doc.get("materias"):
-            for materia_id_str in doc["materias"]:
-                try:
-                    materia = await materias_collection.find_one({"_id": materia_id_str})
-                    if materia:
-                        materias_nombres.append(materia["nombre"])
-                except:
-                    pass
+        for materia_id in normalize_ids(doc.get("materias", [])):
+            materia = materias.get(materia_id)
+            if materia:
+                materias_nombres.append(materia["nombre"])
         
         resultado.append({
             "id": str(doc["_id"]),
@@ -678,14 +745,23 @@ async def asignar_docente_recalificador(
 # =============== GESTIÓN DE RESET DE CONTRASEÑA ===============
 
 @router.get("/solicitudes-reset-password")
-async def listar_solicitudes_reset(current_user: Dict = Depends(get_current_user)):
-    """Lista todas las solicitudes de reset de contraseña"""
+async def listar_solicitudes_reset(
+    response: Response,
+    estado: Optional[Literal["pendiente", "procesando", "completado"]] = None,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Lista las solicitudes de reset de contraseña, opcionalmente por estado (paginado por cursor)"""
     if current_user["role"] != "subdecano":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
     from common.database import reset_password_collection
     
-    solicitudes = await reset_password_collection.find().sort("fecha_solicitud", -1).to_list(length=1000)
+    query = {"estado": estado} if estado else {}
+    solicitudes = await paginate(
+        reset_password_collection, query, page, response, SOLICITUD_RESET_LISTADO_FIELDS,
+        sort_field="fecha_solicitud", direction=-1
+    )
     
     return [
         {
@@ -699,6 +775,137 @@ async def listar_solicitudes_reset(current_user: Dict = Depends(get_current_user
         for sol in solicitudes
     ]
 
+# Máximo de solicitudes procesadas en una llamada al endpoint por lote
+RESET_LOTE_MAX = 500
+# Un reclamo ("procesando") más antiguo que esto se considera abandonado (proceso caído)
+# y puede reclamarse de nuevo
+RESET_RECLAMO_VENCIDO_SEGUNDOS = 300
+
+def _generar_password_temporal() -> str:
+    """
+    Genera una contraseña temporal segura.
+    Formato: palabra + número + carácter especial (ej: Tiger2026!)
+    """
+    import secrets
+    palabras = ["Tiger", "Eagle", "Falcon", "Phoenix", "Dragon", "Viper", "Bear", "Wolf"]
+    palabra = secrets.choice(palabras)
+    numero = secrets.randbelow(9000) + 1000
+    especial = secrets.choice("!@#$%&*")
+    return f"{palabra}{numero}{especial}"
+
+def _reclamable(estados: dict, ahora: datetime) -> dict:
+    """Filtro de solicitudes reclamables: en `estados` o con un reclamo vencido"""
+    return {"$or": [
+        estados,
+        {
+            "estado": "procesando",
+            "fecha_reclamo": {"$lt": ahora - timedelta(seconds=RESET_RECLAMO_VENCIDO_SEGUNDOS)}
+        }
+    ]}
+
+# Declarado antes de /generar-password-reset/{solicitud_id} para que "lote" no se tome como id
+@router.post("/generar-password-reset/lote")
+async def generar_password_reset_lote(
+    datos: GenerarResetLote,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Genera contraseñas temporales para varias solicitudes de reset pendientes"""
+    if current_user["role"] != "subdecano":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
+    
+    from common.database import reset_password_collection
+    from pymongo import UpdateOne
+    
+    if not datos.todas_pendientes and not datos.solicitud_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Indique solicitud_ids o todas_pendientes")
+    if len(datos.solicitud_ids) > RESET_LOTE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {RESET_LOTE_MAX} solicitudes por lote"
+        )
+    
+    # Reclamo atómico: solo las solicitudes que este lote logra pasar a "procesando" se
+    # procesan, así otra llamada por lote o el endpoint individual no generan una segunda
+    # contraseña para el mismo usuario. Un reclamo vencido (proceso caído) se puede retomar.
+    ahora = datetime.utcnow()
+    reclamables = _reclamable({"estado": "pendiente"}, ahora)
+    if datos.todas_pendientes:
+        candidatas = await reset_password_collection.find(
+            reclamables, {"_id": 1}
+        ).sort("fecha_solicitud", 1).limit(RESET_LOTE_MAX).to_list(length=RESET_LOTE_MAX)
+        ids = [sol["_id"] for sol in candidatas]
+    else:
+        ids = to_db_ids(datos.solicitud_ids)
+    
+    lote = uuid.uuid4().hex
+    await reset_password_collection.update_many(
+        {"_id": {"$in": ids}, **reclamables},
+        {"$set": {"estado": "procesando", "lote": lote, "fecha_reclamo": ahora}}
+    )
+    solicitudes = await reset_password_collection.find(
+        {"lote": lote, "estado": "procesando"}, {"email": 1, "rol": 1, "user_id": 1}
+    ).sort("fecha_solicitud", 1).to_list(length=None)
+    
+    if not solicitudes:
+        return {"message": "No hay solicitudes pendientes para procesar", "procesadas": 0, "resultados": []}
+    
+    passwords = [_generar_password_temporal() for _ in solicitudes]
+    try:
+        # Los hashes corren en paralelo en el pool de bcrypt (acotado por password_hash_workers)
+        hashes = await asyncio.gather(*(hash_password_async(p) for p in passwords))
+        # Las contraseñas temporales quedan en la solicitud antes de tocar a los usuarios:
+        # si algo falla después, no se pierden las que ya se aplicaron
+        await reset_password_collection.bulk_write([
+            UpdateOne({"_id": solicitud["_id"], "lote": lote}, {"$set": {"password_temporal": password_temporal}})
+            for solicitud, password_temporal in zip(solicitudes, passwords)
+        ], ordered=False)
+    except Exception:
+        # Ningún usuario se modificó todavía: se devuelven a pendiente
+        await reset_password_collection.update_many(
+            {"lote": lote, "estado": "procesando"},
+            {"$set": {"estado": "pendiente"}, "$unset": {"lote": "", "fecha_reclamo": "", "password_temporal": ""}}
+        )
+        raise
+    
+    # Desde aquí no se revierte: si falla, el reclamo vence y otra llamada lo retoma
+    # generando contraseñas nuevas
+    operaciones_usuarios = {}
+    for solicitud, password_hash in zip(solicitudes, hashes):
+        operaciones_usuarios.setdefault(solicitud["rol"], []).append(UpdateOne(
+            {"_id": to_db_id(solicitud["user_id"])},
+            {"$set": {"password": password_hash, "primer_login": True}}
+        ))
+    await asyncio.gather(*(
+        ROLE_COLLECTIONS[rol].bulk_write(operaciones, ordered=False)
+        for rol, operaciones in operaciones_usuarios.items()
+    ))
+    await reset_password_collection.update_many(
+        {"lote": lote, "estado": "procesando"},
+        {"$set": {"estado": "completado", "fecha_completacion": datetime.utcnow()}}
+    )
+    
+    # El lote está acotado a RESET_LOTE_MAX: se informa cuántas quedan para otra llamada
+    restantes_query = _reclamable({"estado": "pendiente"}, datetime.utcnow())
+    if not datos.todas_pendientes:
+        restantes_query["_id"] = {"$in": ids}
+    pendientes_restantes = await reset_password_collection.count_documents(restantes_query)
+    
+    return {
+        "message": f"{len(solicitudes)} contraseña(s) temporal(es) generada(s)",
+        "procesadas": len(solicitudes),
+        "pendientes_restantes": pendientes_restantes,
+        "resultados": [
+            {
+                "solicitud_id": str(solicitud["_id"]),
+                "email": solicitud["email"],
+                "rol": solicitud["rol"],
+                "password_temporal": password_temporal
+            }
+            for solicitud, password_temporal in zip(solicitudes, passwords)
+        ],
+        "instrucciones": "Comunique estas contraseñas a los usuarios. Deberán cambiarlas en el primer login."
+    }
+
 @router.post("/generar-password-reset/{solicitud_id}")
 async def generar_password_reset(
     solicitud_id: str,
@@ -709,51 +916,53 @@ async def generar_password_reset(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
     from common.database import reset_password_collection
-    import secrets
-    import string
     
-    # Obtener la solicitud
-    solicitud = await reset_password_collection.find_one({"_id": ObjectId(solicitud_id)})
+    # Reclamo atómico, igual que el lote: una solicitud ya completada se puede regenerar,
+    # una que otro proceso está procesando no (salvo que su reclamo haya vencido)
+    ahora = datetime.utcnow()
+    lote = uuid.uuid4().hex
+    solicitud = await reset_password_collection.find_one_and_update(
+        {"_id": to_db_id(solicitud_id), **_reclamable({"estado": {"$ne": "procesando"}}, ahora)},
+        {"$set": {"estado": "procesando", "lote": lote, "fecha_reclamo": ahora}},
+        return_document=ReturnDocument.BEFORE
+    )
     if not solicitud:
+        if await reset_password_collection.count_documents(id_filter(solicitud_id), limit=1):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="La solicitud se está procesando")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Solicitud no encontrada")
     
-    # Generar contraseña temporal segura
-    # Formato: 3 palabras + número + carácter especial (ej: Tiger2026!)
-    palabras = ["Tiger", "Eagle", "Falcon", "Phoenix", "Dragon", "Viper", "Bear", "Wolf"]
-    palabra = secrets.choice(palabras)
-    numero = secrets.randbelow(9000) + 1000
-    especial = secrets.choice("!@#$%&*")
-    password_temporal = f"{palabra}{numero}{especial}"
-    
-    # Obtener la colección del usuario
-    if solicitud["rol"] == "estudiante":
-        collection = estudiantes_collection
-    elif solicitud["rol"] == "docente":
-        collection = docentes_collection
-    else:
-        collection = subdecanos_collection
+    password_temporal = _generar_password_temporal()
+    try:
+        password_hash = await hash_password_async(password_temporal)
+        await reset_password_collection.update_one(
+            {"_id": solicitud["_id"], "lote": lote},
+            {"$set": {"password_temporal": password_temporal}}
+        )
+    except Exception:
+        # El usuario no se modificó: la solicitud vuelve a su estado anterior
+        await reset_password_collection.update_one(
+            {"_id": solicitud["_id"], "lote": lote},
+            {"$set": {"estado": solicitud["estado"]}, "$unset": {"lote": "", "fecha_reclamo": ""}}
+        )
+        raise
     
     # Actualizar la contraseña en la colección del usuario
-    from common.utils.encryption import hash_password
-    
-    await collection.update_one(
-        {"_id": solicitud["user_id"]},
+    await ROLE_COLLECTIONS[solicitud["rol"]].update_one(
+        {"_id": to_db_id(solicitud["user_id"])},
         {
             "$set": {
-                "password": hash_password(password_temporal),
+                "password": password_hash,
                 "primer_login": True  # Forzar cambio en próximo login
             }
         }
     )
     
     # Actualizar la solicitud como completada
-    from datetime import datetime
     await reset_password_collection.update_one(
-        {"_id": ObjectId(solicitud_id)},
+        {"_id": solicitud["_id"], "lote": lote},
         {
             "$set": {
                 "estado": "completado",
-                "password_temporal": password_temporal,
                 "fecha_completacion": datetime.utcnow()
             }
         }
@@ -781,7 +990,7 @@ async def obtener_logs(
     
     from common.database import logs_collection
     
-    logs = await logs_collection.find().sort("fecha", -1).limit(limit).to_list(length=limit)
+    logs = await find_projected(logs_collection, {}, LOG_LISTADO_FIELDS).sort("fecha", -1).limit(limit).to_list(length=limit)
     
     resultado = []
     for log in logs:
@@ -796,3 +1005,89 @@ async def obtener_logs(
         ))
     
     return resultado
+
+# =============== EXPORTACIÓN DE DATOS ===============
+
+def _exportar_solicitud(sol: dict) -> dict:
+    return {
+        "id": str(sol["_id"]),
+        "estudiante_nombre_anonimo": sol.get("estudiante_nombre_anonimo"),
+        "materia_id": str(sol.get("materia_id")),
+        "docente_nombre_anonimo": sol.get("docente_nombre_anonimo"),
+        "docente_recalificador_id": sol.get("docente_recalificador_id"),
+        "grupo": sol.get("grupo"),
+        "aporte": sol.get("aporte"),
+        "calificacion_actual": sol.get("calificacion_actual"),
+        "calificacion_nueva": sol.get("calificacion_nueva"),
+        "estado": sol.get("estado"),
+        "fecha_creacion": sol.get("fecha_creacion"),
+        "fecha_actualizacion": sol.get("fecha_actualizacion")
+    }
+
+def _exportar_log(log: dict) -> dict:
+    return {
+        "id": str(log["_id"]),
+        "usuario_id": log.get("usuario_id"),
+        "rol": log.get("rol"),
+        "accion": log.get("accion"),
+        "detalle": log.get("detalle"),
+        "fecha": log.get("fecha"),
+        "ip": log.get("ip")
+    }
+
+def _exportar_usuario(user: dict) -> dict:
+    return {
+        "id": str(user["_id"]),
+        "email": user.get("email"),
+        "nombre": user.get("nombre"),
+        "carrera": user.get("carrera"),
+        "materias": user.get("materias", user.get("materias_cursando", [])),
+        "activo": user.get("activo", True),
+        "primer_login": user.get("primer_login", False),
+        "fecha_registro": user.get("fecha_registro")
+    }
+
+_CAMPOS_USUARIO = ["id", "email", "nombre", "carrera", "materias", "activo", "primer_login", "fecha_registro"]
+
+@router.get("/exportar/{recurso}")
+async def exportar(
+    recurso: Literal["solicitudes", "logs", "estudiantes", "docentes"],
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    current_user: Dict = Depends(get_current_user)
+):
+    """Exporta solicitudes, logs o usuarios en streaming (NDJSON o CSV)"""
+    if current_user["role"] != "subdecano":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
+    
+    from common.database import logs_collection
+    
+    if recurso == "solicitudes":
+        cursor = solicitudes_collection.find().sort([("fecha_creacion", -1), ("_id", -1)])
+        campos = list(_exportar_solicitud({"_id": ""}).keys())
+        serializer = _exportar_solicitud
+    elif recurso == "logs":
+        cursor = logs_collection.find().sort([("fecha", -1), ("_id", -1)])
+        campos = list(_exportar_log({"_id": ""}).keys())
+        serializer = _exportar_log
+    elif recurso == "estudiantes":
+        cursor = find_projected(estudiantes_collection, {}, ESTUDIANTE_LISTADO_FIELDS)
+        campos = _CAMPOS_USUARIO
+        serializer = _exportar_usuario
+    else:
+        cursor = find_projected(docentes_collection, {}, DOCENTE_LISTADO_FIELDS)
+        campos = _CAMPOS_USUARIO
+        serializer = _exportar_usuario
+    
+    return export_response(cursor, formato, recurso, campos, serializer)
+
+# =============== ÍNDICES DE BASE DE DATOS ===============
+
+@router.get("/indices")
+async def reporte_indices(current_user: Dict = Depends(get_current_user)):
+    """Reporta índices faltantes, no declarados y sin uso por colección"""
+    if current_user["role"] != "subdecano":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
+    
+    from common.indexes import index_report
+    
+    return await index_report()
@@ -5,11 +5,10 @@ from common.database import (
     estudiantes_collection,
     materias_collection
 )
-from passlib.context import CryptContext
 from datetime import datetime
 from bson import ObjectId
-
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+from common.utils.identity import upsert_identity
+from common.utils.encryption import hash_password
 
 async def seed_data():
     print("🌱 Iniciando proceso de siembra de base de datos con nuevos formatos...")
@@ -21,7 +20,7 @@ async def seed_data():
     # o usamos uno específico si se desea. En el screenshot tiene un ObjectId.
     subdecano_data = {
         "email": "admin@blindcheck.edu",
-        "password": pwd_context.hash("Admin2026!"),
+        "password": hash_password("Admin2026!"),
         "nombre": "Administrador",
         "apellido": "BlindCheck",
         "cedula": "1700000001",
@@ -31,14 +30,18 @@ async def seed_data():
     # Buscamos por email para no duplicar
     existing_sub = await subdecanos_collection.find_one({"email": subdecano_data["email"]})
     if not existing_sub:
-        await subdecanos_collection.insert_one(subdecano_data)
+        result = await subdecanos_collection.insert_one(subdecano_data)
+        subdecano_id = result.inserted_id
         print("✅ Subdecano creado: admin@blindcheck.edu")
     else:
         await subdecanos_collection.update_one(
             {"email": subdecano_data["email"]},
             {"$set": subdecano_data}
         )
+        subdecano_id = existing_sub["_id"]
         print("ℹ️ Subdecano actualizado: admin@blindcheck.edu")
+    
+    await upsert_identity(subdecano_data["email"], "subdecano", subdecano_id)
 
     print("🏁 Datos actualizados con éxito según los nuevos formatos.")
 
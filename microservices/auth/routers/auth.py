@@ -1,39 +1,85 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Response, Request
+from fastapi import APIRouter, HTTPException, Depends, status, Response, Request, BackgroundTasks
 
 from datetime import timedelta
-from typing import Dict
+from typing import Dict, Optional
 from common.models.schemas import LoginRequest, LoginResponse, UserRole, CambioPasswordForzado, SolicitudResetPassword
 from common.database import estudiantes_collection, docentes_collection, subdecanos_collection, reset_password_collection
-from common.app_factory import limiter
-from common.utils.encryption import verify_password, decrypt_data, hash_password
-from common.utils.auth import create_access_token, get_current_user
+from common.utils.limiter import limiter
+from common.utils.encryption import verify_password_async, decrypt_data, hash_password_async, password_needs_rehash
+from common.utils.auth import create_access_token, get_current_user, oauth2_scheme, revoke_token, verify_token
 from common.config import settings
 from common.utils.logger import log_action
+from common.utils.identity import ROLE_COLLECTIONS, resolve_identity
+from common.utils.ids import id_filter
+from common.utils.refresh_tokens import (
+    REFRESH_COOKIE, REFRESH_COOKIE_PATH,
+    issue_refresh_token, consume_refresh_token, revoke_family, revoke_refresh_token
+)
 
 router = APIRouter(prefix="/api/auth", tags=["Autenticación"])
 
+def _set_session_cookies(response: Response, access_token: str, refresh_token: str):
+    """Cookie de acceso (todo el sitio) y cookie de refresh (solo /api/auth)"""
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        httponly=True,
+        secure=True,
+        samesite="lax",
+        max_age=settings.access_token_expire_minutes * 60
+    )
+    response.set_cookie(
+        key=REFRESH_COOKIE,
+        value=refresh_token,
+        httponly=True,
+        secure=True,
+        samesite="strict",
+        path=REFRESH_COOKIE_PATH,
+        max_age=settings.refresh_token_expire_days * 24 * 60 * 60
+    )
+
+async def _rehash_password(role: str, user_id, password_actual: str, plain_password: str):
+    """Rehashea con el costo configurado; no pisa la contraseña si cambió entretanto"""
+    try:
+        nuevo_hash = await hash_password_async(plain_password)
+        filtro = id_filter(user_id)
+        filtro["password"] = password_actual
+        await ROLE_COLLECTIONS[role].update_one(filtro, {"$set": {"password": nuevo_hash}})
+    except Exception as e:
+        print(f"❌ Error al rehashear contraseña de {user_id}: {e}")
+
 @router.post("/login", response_model=LoginResponse)
 @limiter.limit("5/minute")
-async def login(login_data: LoginRequest, request: Request, response: Response):
+async def login(login_data: LoginRequest, request: Request, response: Response, background_tasks: BackgroundTasks):
     """Endpoint de inicio de sesión para todos los roles"""
     
-    # Seleccionar la colección según el rol
-    if login_data.role == UserRole.ESTUDIANTE:
-        collection = estudiantes_collection
-    elif login_data.role == UserRole.DOCENTE:
-        collection = docentes_collection
-    elif login_data.role == UserRole.SUBDECANO:
-        collection = subdecanos_collection
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Rol no válido"
-        )
+    role = login_data.role
+    user = None
     
-    # Buscar usuario por email
-    user = await collection.find_one({"email": login_data.email})
+    if role is None:
+        # Sin rol: una búsqueda puntual en el directorio de identidades y luego por _id
+        identidad = await resolve_identity(login_data.email)
+        if identidad:
+            role = UserRole(identidad["rol"])
+            user = await ROLE_COLLECTIONS[identidad["rol"]].find_one(id_filter(identidad["user_id"]))
+    else:
+        # Seleccionar la colección según el rol
+        if role == UserRole.ESTUDIANTE:
+            collection = estudiantes_collection
+        elif role == UserRole.DOCENTE:
+            collection = docentes_collection
+        elif role == UserRole.SUBDECANO:
+            collection = subdecanos_collection
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Rol no válido"
+            )
+        
+        # Buscar usuario por email
+        user = await collection.find_one({"email": login_data.email})
     
-    if not user or not verify_password(login_data.password, user["password"]):
+    if not user or not await verify_password_async(login_data.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email o contraseña incorrectos",
@@ -41,47 +87,111 @@ async def login(login_data: LoginRequest, request: Request, response: Response):
         )
     
     # Verificar si usuario está activo (para estudiantes y docentes)
-    if login_data.role in [UserRole.ESTUDIANTE, UserRole.DOCENTE] and not user.get("activo", True):
+    if role in [UserRole.ESTUDIANTE, UserRole.DOCENTE] and not user.get("activo", True):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Usuario desactivado. Contacte al administración."
         )
 
+    # Hash con otro costo de bcrypt: se rehashea después de responder
+    if password_needs_rehash(user["password"]):
+        background_tasks.add_task(_rehash_password, role.value, user["_id"], user["password"], login_data.password)
+
     # Crear token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": str(user["_id"]), "role": login_data.role, "email": user["email"]},
+        data={"sub": str(user["_id"]), "role": role, "email": user["email"]},
         expires_delta=access_token_expires
     )
     
+    refresh_token = await issue_refresh_token(str(user["_id"]), role.value, user["email"])
+    
     # REGISTRAR LOG
     client_ip = request.client.host if request.client else "Unknown"
-    await log_action(str(user["_id"]), login_data.role, "LOGIN", "Inicio de sesión exitoso", client_ip)
+    await log_action(str(user["_id"]), role, "LOGIN", "Inicio de sesión exitoso", client_ip)
     
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=True,
-        samesite="lax",
-        max_age=settings.access_token_expire_minutes * 60
-    )
+    _set_session_cookies(response, access_token, refresh_token)
     
     response_data = {
         "message": "Inicio de sesión exitoso",
-        "role": login_data.role,
+        "role": role,
         "user_id": str(user["_id"]),
         "primer_login": user.get("primer_login", False)
     }
     
     return response_data
 
+@router.post("/refresh")
+@limiter.limit("30/minute")
+async def refresh(request: Request, response: Response):
+    """Renueva el token de acceso con el refresh token (rotación, sin bcrypt)"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Sesión expirada",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    token = request.cookies.get(REFRESH_COOKIE)
+    if not token:
+        raise credentials_exception
+    
+    sesion = await consume_refresh_token(token)
+    if not sesion:
+        raise credentials_exception
+    
+    # El usuario debe seguir existiendo y activo (consulta puntual al directorio)
+    identidad = await resolve_identity(sesion["email"])
+    if not identidad or identidad["user_id"] != sesion["user_id"] or not identidad.get("activo", True):
+        await revoke_family(sesion["familia"])
+        raise credentials_exception
+    
+    access_token = create_access_token(
+        data={"sub": sesion["user_id"], "role": sesion["rol"], "email": sesion["email"]},
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+    )
+    nuevo_refresh = await issue_refresh_token(sesion["user_id"], sesion["rol"], sesion["email"], familia=sesion["familia"])
+    
+    _set_session_cookies(response, access_token, nuevo_refresh)
+    
+    return {"message": "Sesión renovada", "role": sesion["rol"], "user_id": sesion["user_id"]}
+
 @router.post("/verify-token")
 @limiter.limit("20/minute")
 async def verify_token_endpoint(request: Request, current_user: Dict = Depends(get_current_user)):
     """Verifica si un token es válido"""
     return {"valid": True, "user": current_user}
 
+@router.get("/introspect", status_code=status.HTTP_204_NO_CONTENT)
+async def introspect(request: Request, token: Optional[str] = Depends(oauth2_scheme)):
+    """
+    Validación para auth_request del gateway: sin cuerpo; la BD (revocaciones) solo se
+    consulta cuando el token no está en la caché de verificación.
+    Responde 204 con la identidad en headers o 401; X-Accel-Expires indica a nginx
+    cuánto cachear la decisión (nunca más allá del exp del token).
+    """
+    import time
+    
+    final_token = token or request.cookies.get("access_token")
+    payload = await verify_token(final_token) if final_token else None
+    
+    if not payload or not payload.get("sub") or not payload.get("role"):
+        return Response(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"Cache-Control": "no-store", "WWW-Authenticate": "Bearer"}
+        )
+    
+    ttl = max(0, min(settings.introspect_cache_seconds, int(payload["exp"] - time.time())))
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={
+            "X-User-Id": str(payload["sub"]),
+            "X-User-Role": str(payload["role"]),
+            "X-User-Email": str(payload.get("email") or ""),
+            "Cache-Control": f"private, max-age={ttl}",
+            "X-Accel-Expires": str(ttl)
+        }
+    )
+
 @router.get("/me")
 async def get_me(current_user: Dict = Depends(get_current_user)):
     """Obtiene la información del usuario actual desde el token"""
@@ -92,13 +202,22 @@ async def get_me(current_user: Dict = Depends(get_current_user)):
     }
 
 @router.post("/logout")
-async def logout(response: Response):
-    """Cierra la sesión (borra la cookie)"""
+async def logout(request: Request, response: Response, token: Optional[str] = Depends(oauth2_scheme)):
+    """Cierra la sesión (borra las cookies y revoca el access y el refresh token)"""
+    await revoke_token(token)
+    await revoke_token(request.cookies.get("access_token"))
+    await revoke_refresh_token(request.cookies.get(REFRESH_COOKIE))
     response.delete_cookie(
         key="access_token",
         httponly=True,
         samesite="lax"
     )
+    response.delete_cookie(
+        key=REFRESH_COOKIE,
+        path=REFRESH_COOKIE_PATH,
+        httponly=True,
+        samesite="strict"
+    )
     return {"message": "Sesión cerrada exitosamente"}
 
 @router.post("/cambiar-password-forzado")
@@ -126,7 +245,7 @@ async def cambiar_password_forzado(
         {"_id": current_user["user_id"]},
         {
             "$set": {
-                "password": hash_password(datos.password_nueva),
+                "password": await hash_password_async(datos.password_nueva),
                 "primer_login": False
             }
         }
@@ -146,31 +265,15 @@ async def solicitar_reset_password(datos: SolicitudResetPassword, request: Reque
     """Crea una solicitud de reset de contraseña"""
     from datetime import datetime
     
-    # Buscar el usuario en cualquier colección
-    user = None
-    rol = None
+    # Resolver rol y usuario en el directorio de identidades (una sola consulta)
+    identidad = await resolve_identity(datos.email)
     
-    # Buscar en estudiantes
-    user = await estudiantes_collection.find_one({"email": datos.email})
-    if user:
-        rol = "estudiante"
-    else:
-        # Buscar en docentes
-        user = await docentes_collection.find_one({"email": datos.email})
-        if user:
-            rol = "docente"
-        else:
-            # Buscar en subdecanos
-            user = await subdecanos_collection.find_one({"email": datos.email})
-            if user:
-                rol = "subdecano"
-    
-    if not user:
+    if not identidad:
         # No revelar si el email existe o no (seguridad)
         return {"message": "Si el email existe, se enviará una solicitud al subdecano"}
     
     # BLOQUEAR RESET PARA SUBDECANOS
-    if rol == "subdecano":
+    if identidad["rol"] == "subdecano":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Los subdecanos no pueden solicitar reset de contraseña. Contacte directamente con el administrador."
@@ -188,8 +291,8 @@ async def solicitar_reset_password(datos: SolicitudResetPassword, request: Reque
     # Crear solicitud de reset
     solicitud = {
         "email": datos.email,
-        "user_id": str(user["_id"]),
-        "rol": rol,
+        "user_id": identidad["user_id"],
+        "rol": identidad["rol"],
         "estado": "pendiente",
         "fecha_solicitud": datetime.utcnow(),
         "fecha_completacion": None,
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Depends, status, Response
+from typing import List, Dict, Optional
 from bson import ObjectId
 from datetime import datetime
 from common.models.schemas import (
     SolicitudCreate, SolicitudResponse, EstadoSolicitud,
     EstudianteUpdate, EstudianteResponse, MensajeResponse,
-    CalificacionResponse
+    CalificacionResponse, SOLICITUD_LISTADO_FIELDS, MENSAJE_LISTADO_FIELDS, DOCENTE_OPCION_FIELDS
 )
 from common.database import (
     solicitudes_collection, estudiantes_collection, 
-    mensajes_collection, materias_collection, calificaciones_collection,
+    mensajes_collection, calificaciones_collection,
     docentes_collection, evidencias_collection
 )
 from common.utils.auth import get_current_user
 from common.utils.logger import log_action
 from common.utils.encryption import anonymize_name, anonymize_profesor
+from common.utils.ids import normalize_id, id_filter
+from common.utils.catalog import materias_catalog
+from common.utils.pagination import PageParams, paginate
+from common.utils.queries import find_projected
 
 router = APIRouter(prefix="/api/estudiante", tags=["Estudiante"])
 
@@ -72,12 +76,8 @@ async def crear_solicitud(
     if current_user["role"] != "estudiante":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    # Verificar que la materia existe (convertir a ObjectId)
-    try:
-        materia_oid = ObjectId(solicitud.materia_id)
-        materia = await materias_collection.find_one({"_id": materia_oid})
-    except:
-        materia = await materias_collection.find_one({"_id": solicitud.materia_id})
+    # Verificar que la materia existe
+    materia = await materias_catalog.get(solicitud.materia_id)
     
     if not materia:
         # Debug para ver por qué falla
@@ -85,15 +85,7 @@ async def crear_solicitud(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Materia no encontrada")
     
     # Verificar que el docente existe
-    # Los docentes pueden tener ID string (DOC123) o ObjectId
-    docente = await docentes_collection.find_one({"_id": solicitud.docente_id})
-    if not docente:
-        # Intentar con ObjectId por si acaso
-        try:
-             docente = await docentes_collection.find_one({"_id": ObjectId(solicitud.docente_id)})
-        except:
-             pass
-             
+    docente = await docentes_collection.find_one(id_filter(solicitud.docente_id))
     if not docente:
         print(f"❌ Docente no encontrado: {solicitud.docente_id}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Docente no encontrado")
@@ -101,8 +93,8 @@ async def crear_solicitud(
     # ✅ VALIDACIÓN CRÍTICA: Verificar que exista una evidencia subida para esta combinación
     # docente_id, materia_id, grupo, aporte
     evidencia = await evidencias_collection.find_one({
-        "docente_id": solicitud.docente_id,
-        "materia_id": solicitud.materia_id,
+        "docente_id": normalize_id(solicitud.docente_id),
+        "materia_id": normalize_id(solicitud.materia_id),
         "grupo": solicitud.grupo,
         "aporte": solicitud.aporte
     })
@@ -119,8 +111,8 @@ async def crear_solicitud(
     nueva_solicitud = {
         "estudiante_id": current_user["user_id"],
         "estudiante_nombre_anonimo": anonymize_name(estudiante['nombre'], str(estudiante["_id"])),
-        "materia_id": solicitud.materia_id,
-        "docente_id": solicitud.docente_id,
+        "materia_id": normalize_id(solicitud.materia_id),
+        "docente_id": normalize_id(solicitud.docente_id),
         "docente_nombre_anonimo": anonymize_name(docente['nombre'], str(docente["_id"])),
         "grupo": solicitud.grupo,
         "aporte": solicitud.aporte,
@@ -170,44 +162,32 @@ async def crear_solicitud(
     )
 
 @router.get("/solicitudes", response_model=List[SolicitudResponse])
-async def listar_solicitudes(current_user: Dict = Depends(get_current_user)):
-    """Lista todas las solicitudes del estudiante"""
+async def listar_solicitudes(
+    response: Response,
+    estado: Optional[EstadoSolicitud] = None,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Lista las solicitudes del estudiante, opcionalmente por estado (paginado por cursor)"""
     if current_user["role"] != "estudiante":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    solicitudes = await solicitudes_collection.find(
-        {"estudiante_id": current_user["user_id"]}
-    ).sort("fecha_creacion", -1).to_list(length=100)
+    query = {"estudiante_id": current_user["user_id"]}
+    if estado:
+        query["estado"] = estado.value
+    
+    solicitudes = await paginate(
+        solicitudes_collection,
+        query,
+        page, response, SOLICITUD_LISTADO_FIELDS, sort_field="fecha_creacion", direction=-1
+    )
+    
+    # Nombres de materias desde el catálogo en memoria (sin consultas por fila)
+    materias = await materias_catalog.get_many(sol["materia_id"] for sol in solicitudes)
     
     resultado = []
     for sol in solicitudes:
-        # Buscar materia - puede ser string o ObjectId
-        materia_id = sol["materia_id"]
-        print(f"🔍 DEBUG: Buscando materia con ID: {materia_id} (tipo: {type(materia_id)})")
-        
-        # Intentar buscar como está
-        materia = await materias_collection.find_one({"_id": materia_id})
-        
-        # Si no se encuentra y es string, intentar como ObjectId
-        if not materia and isinstance(materia_id, str):
-            try:
-                materia = await materias_collection.find_one({"_id": ObjectId(materia_id)})
-                print(f"   ✅ Materia encontrada como ObjectId")
-            except:
-                print(f"   ❌ No se pudo convertir a ObjectId")
-        
-        # Si no se encuentra y es ObjectId, intentar como string
-        if not materia and isinstance(materia_id, ObjectId):
-            materia = await materias_collection.find_one({"_id": str(materia_id)})
-            if materia:
-                print(f"   ✅ Materia encontrada como string")
-        
-        if materia:
-            print(f"   ✅ Materia encontrada: {materia['nombre']}")
-        else:
-            print(f"   ❌ Materia NO encontrada")
-        
-        docente = await docentes_collection.find_one({"_id": sol["docente_id"]})
+        materia = materias.get(normalize_id(sol["materia_id"]))
         
         resultado.append(SolicitudResponse(
             id=str(sol["_id"]),
@@ -248,7 +228,7 @@ async def obtener_solicitud(
     if not solicitud:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Solicitud no encontrada")
     
-    materia = await materias_collection.find_one({"_id": solicitud["materia_id"]})
+    materia = await materias_catalog.get(solicitud["materia_id"])
     
     # Obtener calificaciones
     calificaciones = []
@@ -288,14 +268,25 @@ async def obtener_solicitud(
     )
 
 @router.get("/mensajes", response_model=List[MensajeResponse])
-async def listar_mensajes(current_user: Dict = Depends(get_current_user)):
-    """Lista todos los mensajes del estudiante"""
+async def listar_mensajes(
+    response: Response,
+    leido: Optional[bool] = None,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Lista los mensajes del estudiante, opcionalmente solo leídos o no leídos (paginado por cursor)"""
     if current_user["role"] != "estudiante":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    mensajes = await mensajes_collection.find(
-        {"destinatario_id": current_user["user_id"]}
-    ).sort("fecha_envio", -1).to_list(length=100)
+    query = {"destinatario_id": current_user["user_id"]}
+    if leido is not None:
+        query["leido"] = leido
+    
+    mensajes = await paginate(
+        mensajes_collection,
+        query,
+        page, response, MENSAJE_LISTADO_FIELDS, sort_field="fecha_envio", direction=-1
+    )
     
     return [
         MensajeResponse(
@@ -356,13 +347,13 @@ async def obtener_materias(current_user: Dict = Depends(get_current_user)):
         print(f"   ⚠️ Estudiante no tiene materias asignadas")
         return []
     
-    # Los IDs en MongoDB son strings como 'CS-301', no ObjectIds
     print(f"   IDs a buscar: {materias_cursando}")
     
-    # Obtener solo las materias que está cursando
-    materias = await materias_collection.find(
-        {"_id": {"$in": materias_cursando}}
-    ).to_list(100)
+    # Obtener solo las materias que está cursando (desde el catálogo en memoria)
+    materias = [
+        mat for mat in (await materias_catalog.get_many(materias_cursando)).values()
+        if mat
+    ]
     
     print(f"   Materias encontradas: {len(materias)}")
     
@@ -382,7 +373,7 @@ async def obtener_docentes(current_user: Dict = Depends(get_current_user)):
     if current_user["role"] != "estudiante":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    docentes = await docentes_collection.find().to_list(100)
+    docentes = await find_projected(docentes_collection, {}, DOCENTE_OPCION_FIELDS).to_list(100)
     
     return [
         {
@@ -402,62 +393,59 @@ async def obtener_opciones_solicitud(current_user: Dict = Depends(get_current_us
     if current_user["role"] != "estudiante":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    # Obtener el estudiante
-    estudiante = await estudiantes_collection.find_one({"_id": current_user["user_id"]})
+    # Verificar que el estudiante existe
+    estudiante = await estudiantes_collection.find_one({"_id": current_user["user_id"]}, {"_id": 1})
     if not estudiante:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estudiante no encontrado")
     
-    materias_cursando = estudiante.get("materias_cursando", [])
+    # Una sola agregación: agrupa las evidencias del estudiante por
+    # (docente, materia, grupo, aporte) y trae el nombre del docente en bloque.
+    pipeline = [
+        {"$match": {"estudiante_id": current_user["user_id"]}},
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {
+                "docente_id": {"$toString": "$docente_id"},
+                "materia_id": {"$toString": "$materia_id"},
+                "grupo": "$grupo",
+                "aporte": "$aporte"
+            },
+            "evidencia_url": {"$first": "$archivo_url"},
+            "evidencia_variantes": {"$first": "$archivo_variantes"}
+        }},
+        {"$lookup": {
+            "from": docentes_collection.name,
+            "localField": "_id.docente_id",
+            "foreignField": "_id",
+            "as": "docente"
+        }},
+        # Descarta opciones cuyo docente ya no existe
+        {"$unwind": "$docente"},
+        {"$project": {"evidencia_url": 1, "evidencia_variantes": 1, "docente_nombre": "$docente.nombre"}},
+        {"$sort": {"_id.materia_id": 1, "_id.docente_id": 1, "_id.grupo": 1, "_id.aporte": 1}}
+    ]
+    grupos = await evidencias_collection.aggregate(pipeline).to_list(length=None)
     
-    # Obtener SOLO las evidencias del estudiante actual
-    evidencias = await evidencias_collection.find({
-        "estudiante_id": current_user["user_id"]
-    }).to_list(1000)
+    # Nombres de materias desde el catálogo en memoria
+    materias = await materias_catalog.get_many(g["_id"]["materia_id"] for g in grupos)
     
     opciones = []
-    
-    for evidencia in evidencias:
-        # Obtener datos del docente
-        docente_id = evidencia["docente_id"]
-        docente = await docentes_collection.find_one({"_id": docente_id})
-        
-        # Obtener datos de la materia (convertir a ObjectId si es necesario)
-        materia_id_str = evidencia["materia_id"]
-        try:
-            materia_oid = ObjectId(materia_id_str)
-            materia = await materias_collection.find_one({"_id": materia_oid})
-        except:
-            # Si falla la conversión, intentar buscar como string (backup)
-            materia = await materias_collection.find_one({"_id": materia_id_str})
-        
-        if not docente or not materia:
+    for grupo in grupos:
+        clave = grupo["_id"]
+        materia = materias.get(clave["materia_id"])
+        if not materia:
             continue
         
-        # Crear la opción de solicitud
-        opcion = {
-            "docente_id": str(evidencia["docente_id"]),
-            "docente_nombre": docente["nombre"],
-            "materia_id": str(evidencia["materia_id"]),
+        opciones.append({
+            "docente_id": clave["docente_id"],
+            "docente_nombre": grupo["docente_nombre"],
+            "materia_id": clave["materia_id"],
             "materia_nombre": materia["nombre"],
-            "grupo": evidencia["grupo"],
-            "aporte": evidencia["aporte"],
-            "evidencia_url": evidencia.get("archivo_url")
-        }
-        
-        # Evitar duplicados
-        # Hacemos una clave única para verificar duplicados
-        opcion_key = f"{opcion['docente_id']}-{opcion['materia_id']}-{opcion['grupo']}-{opcion['aporte']}"
-        
-        # Verificar si ya existe en la lista (basado en contenido, no referencia)
-        exists = False
-        for op in opciones:
-            k = f"{op['docente_id']}-{op['materia_id']}-{op['grupo']}-{op['aporte']}"
-            if k == opcion_key:
-                exists = True
-                break
-        
-        if not exists:
-            opciones.append(opcion)
+            "grupo": clave["grupo"],
+            "aporte": clave["aporte"],
+            "evidencia_url": grupo.get("evidencia_url"),
+            "evidencia_variantes": grupo.get("evidencia_variantes") or {}
+        })
     
     return opciones
 
@@ -0,0 +1,287 @@
+import asyncio
+import hashlib
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+from PIL import Image, ExifTags
+from prometheus_client import Counter, Gauge, Histogram
+from common.config import settings
+
+# =============== MOTOR DE PROCESAMIENTO DE IMÁGENES ===============
+# Decodificar, orientar, recortar y codificar una foto de 12 MP cuesta cientos de ms
+# de CPU con el GIL tomado, así que corre en un pool de procesos acotado.
+# El router solo espera (await) el resultado; el semáforo limita los trabajos
+# pendientes y cada trabajo tiene un timeout que se aplica dentro del proceso y,
+# como respaldo, otro en el proceso padre que recicla el pool.
+
+IMAGE_JOBS_IN_FLIGHT = Gauge(
+    "image_engine_jobs_in_flight",
+    "Trabajos de imagen ejecutándose en el pool de procesos"
+)
+IMAGE_JOB_QUEUE_WAIT = Histogram(
+    "image_engine_queue_wait_seconds",
+    "Tiempo esperando un lugar en el pool de imágenes"
+)
+IMAGE_JOB_DURATION = Histogram(
+    "image_engine_job_duration_seconds",
+    "Duración de un trabajo de imagen",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+IMAGE_JOBS_FAILED = Counter(
+    "image_engine_jobs_failed_total",
+    "Trabajos de imagen fallidos",
+    ["reason"]
+)
+
+# Derivados de cada evidencia: nombre -> (lado máximo en px, calidad WebP).
+# thumb para listados, preview para visores a tamaño de pantalla.
+VARIANTES = {
+    "thumb": (320, 70),
+    "preview": (1600, 80),
+}
+
+class ImageEngineError(Exception):
+    """Error base del motor de imágenes"""
+
+class ImageTooLargeError(ImageEngineError):
+    """La imagen supera el máximo de píxeles permitido (posible bomba de descompresión)"""
+
+class ImageTimeoutError(ImageEngineError):
+    """El trabajo superó el tiempo máximo"""
+
+class InvalidImageError(ImageEngineError):
+    """El archivo no es una imagen válida"""
+
+# Función para corregir orientación EXIF
+def correct_image_orientation(img):
+    """Corrige la orientación de la imagen según metadatos EXIF"""
+    try:
+        # Obtener información EXIF
+        exif = img._getexif()
+        if exif is None:
+            return img
+
+        # Buscar el tag de orientación
+        orientation_key = None
+        for tag, value in ExifTags.TAGS.items():
+            if value == 'Orientation':
+                orientation_key = tag
+                break
+
+        if orientation_key is None:
+            return img
+
+        orientation = exif.get(orientation_key)
+
+        # Aplicar rotación según orientación EXIF
+        if orientation == 3:
+            img = img.rotate(180, expand=True)
+        elif orientation == 6:
+            img = img.rotate(270, expand=True)
+        elif orientation == 8:
+            img = img.rotate(90, expand=True)
+
+    except (AttributeError, KeyError, IndexError, TypeError):
+        # Si no hay EXIF o hay error, devolver imagen original
+        pass
+    return img
+
+# --------------- Código que corre dentro de los procesos del pool ---------------
+
+def _init_worker(max_pixels: int):
+    # Pillow lanza DecompressionBombError por encima de 2x este valor; el límite
+    # exacto se valida en _abrir con las dimensiones del encabezado.
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _on_timeout(signum, frame):
+    raise ImageTimeoutError("Tiempo máximo de procesamiento excedido")
+
+def _run_with_timeout(timeout: float, fn, *args):
+    """
+    Ejecuta fn con una alarma del proceso. El manejador de la señal solo corre entre
+    bytecodes: una llamada larga en C (decodificar, save) termina antes de cortarse.
+    Para eso está el timeout del proceso padre en ImageEngine._submit.
+    """
+    signal.signal(signal.SIGALRM, _on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+def _abrir(origen: str, max_pixels: int):
+    try:
+        img = Image.open(origen)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e))
+    except (OSError, SyntaxError) as e:
+        raise InvalidImageError(str(e))
+    # Solo se leyó el encabezado: se valida antes de decodificar los píxeles
+    if img.width * img.height > max_pixels:
+        raise ImageTooLargeError(f"{img.width}x{img.height} supera {max_pixels} píxeles")
+    return img
+
+def variant_filename(filename: str, nombre: str) -> str:
+    """Nombre del derivado `nombre` de un archivo de evidencia (ej. abc123_thumb.webp)"""
+    return f"{Path(filename).stem}_{nombre}.webp"
+
+def _guardar_variantes(img, destino: str) -> dict:
+    """Genera los derivados WebP junto al archivo final; retorna nombre -> archivo"""
+    destino = Path(destino)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    variantes = {}
+    # De mayor a menor: cada derivado se reduce desde el anterior, no desde el original
+    for nombre, (lado, calidad) in sorted(VARIANTES.items(), key=lambda v: -v[1][0]):
+        img = img.copy()
+        img.thumbnail((lado, lado))
+        archivo = variant_filename(destino.name, nombre)
+        img.save(destino.with_name(archivo), format="WEBP", quality=calidad, method=4)
+        variantes[nombre] = archivo
+    return variantes
+
+def _sha256_archivo(ruta: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(bloque)
+    return sha256.hexdigest()
+
+def _variantes(origen: str, max_pixels: int) -> dict:
+    img = correct_image_orientation(_abrir(origen, max_pixels))
+    return {"width": img.width, "height": img.height, "variantes": _guardar_variantes(img, origen)}
+
+def _recortar(origen: str, destino: str, crop_area: Optional[dict], max_pixels: int) -> dict:
+    img = _abrir(origen, max_pixels)
+
+    # PASO 1: Corregir orientación EXIF primero
+    img = correct_image_orientation(img)
+
+    # PASO 2: Si hay área para recortar, eliminar el rectángulo y todo lo que está arriba
+    recortada = False
+    if crop_area and crop_area.get("width", 0) > 0 and crop_area.get("height", 0) > 0:
+        crop_from_y = int(crop_area["y"]) + int(crop_area["height"])
+        crop_from_y = max(0, min(crop_from_y, img.height - 1))
+        img = img.crop((0, crop_from_y, img.width, img.height))
+        recortada = True
+
+    # El formato de salida se deduce de la extensión del destino
+    img.save(destino)
+    variantes = _guardar_variantes(img, destino)
+    return {
+        "width": img.width,
+        "height": img.height,
+        "recortada": recortada,
+        "variantes": variantes,
+        # Hash de los bytes procesados: clave del almacenamiento por contenido
+        "sha256": _sha256_archivo(destino)
+    }
+
+# --------------- API asíncrona usada por el router ---------------
+
+class ImageEngine:
+    """Pool de procesos para el procesamiento de imágenes de evidencias"""
+
+    def __init__(self, workers: int, max_pending: int, job_timeout: float, max_pixels: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+        self.max_pixels = max_pixels
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+        # spawn: los procesos no heredan los hilos ni sockets de Motor del proceso padre
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.max_pixels,)
+        )
+        # Se conserva entre reinicios: los trabajos en curso liberan el mismo semáforo
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        print(f"🖼️ Motor de imágenes iniciado ({self.workers} proceso(s))")
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _restart(self, executor: ProcessPoolExecutor, terminar: bool = False):
+        """
+        Recrea el pool si un proceso murió (ej. sin memoria) o quedó ocupado tras un timeout.
+        Solo actúa si `executor` sigue siendo el pool actual: varios trabajos fallidos del
+        mismo pool no lo reinician más de una vez ni tiran abajo uno ya recreado.
+        """
+        if self._executor is not executor:
+            return
+        self._executor = None
+        if terminar:
+            # shutdown no detiene un proceso ocupado: se termina para liberar la CPU
+            for proceso in list((executor._processes or {}).values()):
+                proceso.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    async def _submit(self, operation: str, fn, *args):
+        if self._executor is None:
+            self.start()
+        encolado = time.perf_counter()
+        async with self._slots:
+            IMAGE_JOB_QUEUE_WAIT.observe(time.perf_counter() - encolado)
+            IMAGE_JOBS_IN_FLIGHT.inc()
+            inicio = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            # Se fija el pool antes de enviar: un reinicio solo aplica al pool que falló
+            executor = self._executor
+            try:
+                # Margen sobre el timeout del proceso por si la alarma no llega a dispararse
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, _run_with_timeout, self.job_timeout, fn, *args),
+                    timeout=self.job_timeout + 5
+                )
+            except ImageTimeoutError:
+                IMAGE_JOBS_FAILED.labels(reason="timeout").inc()
+                raise
+            except asyncio.TimeoutError:
+                # El semáforo libera el lugar pero el proceso sigue ocupado: se recicla el pool
+                IMAGE_JOBS_FAILED.labels(reason="timeout").inc()
+                self._restart(executor, terminar=True)
+                raise ImageTimeoutError("Tiempo máximo de procesamiento excedido")
+            except ImageTooLargeError:
+                IMAGE_JOBS_FAILED.labels(reason="demasiado_grande").inc()
+                raise
+            except InvalidImageError:
+                IMAGE_JOBS_FAILED.labels(reason="imagen_invalida").inc()
+                raise
+            except BrokenProcessPool:
+                IMAGE_JOBS_FAILED.labels(reason="pool_caido").inc()
+                self._restart(executor)
+                raise ImageEngineError("El procesador de imágenes se reinició, intente nuevamente")
+            finally:
+                IMAGE_JOBS_IN_FLIGHT.dec()
+                IMAGE_JOB_DURATION.labels(operation=operation).observe(time.perf_counter() - inicio)
+
+    async def recortar(self, origen: Path, destino: Path, crop_area: Optional[dict]) -> dict:
+        """Orienta según EXIF, recorta la cabecera marcada y guarda en destino con sus derivados"""
+        return await self._submit("recortar", _recortar, str(origen), str(destino), crop_area, self.max_pixels)
+
+    async def variantes(self, origen: Path) -> dict:
+        """Genera los derivados (thumb, preview) de un archivo ya guardado"""
+        return await self._submit("variantes", _variantes, str(origen), self.max_pixels)
+
+image_engine = ImageEngine(
+    workers=settings.image_workers,
+    max_pending=settings.image_max_pending,
+    job_timeout=settings.image_job_timeout_seconds,
+    max_pixels=settings.image_max_pixels
+)
@@ -1,5 +1,9 @@
 from common.app_factory import create_app
 from routers import docente
+from image_engine import image_engine
+import storage
+from temp_janitor import temp_janitor
+import asyncio
 from pathlib import Path
 from fastapi.staticfiles import StaticFiles
 
@@ -13,6 +17,43 @@ UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+# Pool de procesos para el procesamiento de imágenes
+@app.on_event("startup")
+async def start_image_engine():
+    image_engine.start()
+
+@app.on_event("shutdown")
+async def stop_image_engine():
+    # shutdown(wait=True) espera a los procesos: en un hilo para no bloquear el loop
+    await asyncio.to_thread(image_engine.stop)
+
+# Recolector de archivos de evidencias sin referencias
+@app.on_event("startup")
+async def start_storage_gc():
+    app.state.storage_gc = asyncio.create_task(storage.gc_loop())
+
+async def stop_storage_gc():
+    tarea = getattr(app.state, "storage_gc", None)
+    if tarea is None or tarea.done():
+        return
+    tarea.cancel()
+    try:
+        await tarea
+    except asyncio.CancelledError:
+        pass
+
+# Primero en el apagado: el recolector usa la BD y debe detenerse antes de close_db
+app.router.on_shutdown.insert(0, stop_storage_gc)
+
+# Limpieza de temporales (TTL + cuota de disco)
+@app.on_event("startup")
+async def start_temp_janitor():
+    await temp_janitor.start()
+
+@app.on_event("shutdown")
+async def stop_temp_janitor():
+    await temp_janitor.stop()
+
 app.include_router(docente.router)
 
 @app.get("/health")
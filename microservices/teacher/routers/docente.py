@@ -1,18 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Body
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Body, Response
 from typing import List, Dict
 from bson import ObjectId
 from datetime import datetime
 import hashlib
 import os
 from pathlib import Path
-from PIL import Image, ImageFilter, ExifTags
-import io
-import base64
 from common.models.schemas import (
     DocenteUpdate, DocenteResponse,
     EvidenciaCreate, EvidenciaResponse,
     CalificacionCreate, CalificacionResponse,
-    SolicitudResponse, EstadoSolicitud
+    SolicitudResponse, EstadoSolicitud,
+    ESTUDIANTE_VINCULACION_FIELDS, EVIDENCIA_LISTADO_FIELDS, SOLICITUD_LISTADO_FIELDS
 )
 from common.database import (
     docentes_collection, evidencias_collection,
@@ -22,52 +20,26 @@ from common.database import (
 from common.utils.auth import get_current_user
 from common.utils.logger import log_action
 from common.utils.encryption import anonymize_name, anonymize_profesor
+from common.utils.ids import normalize_id, normalize_ids
+from common.utils.catalog import materias_catalog
+from common.utils.pagination import PageParams, paginate
+from common.utils.queries import find_projected
+from common.utils.uploads import save_upload, UploadTooLargeError
+from image_engine import image_engine, ImageEngineError, ImageTooLargeError, ImageTimeoutError, InvalidImageError
+import storage
+
+def _urls_variantes(variantes: Dict[str, str]) -> Dict[str, str]:
+    """URLs públicas de los derivados de una evidencia"""
+    return {nombre: f"/uploads/evidencias/{archivo}" for nombre, archivo in variantes.items()}
 
 router = APIRouter(prefix="/api/docente", tags=["Docente"])
 
-# Directorios para guardar evidencias
-UPLOAD_DIR = Path("uploads/evidencias")
+# Directorios para guardar evidencias (evidencias/ es direccionado por contenido, ver storage.py)
+UPLOAD_DIR = storage.UPLOAD_DIR
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 TEMP_DIR = Path("uploads/temp")
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
-# Función para corregir orientación EXIF
-def correct_image_orientation(img):
-    """Corrige la orientación de la imagen según metadatos EXIF"""
-    try:
-        # Obtener información EXIF
-        exif = img._getexif()
-        if exif is None:
-            return img
-        
-        # Buscar el tag de orientación
-        orientation_key = None
-        for tag, value in ExifTags.TAGS.items():
-            if value == 'Orientation':
-                orientation_key = tag
-                break
-        
-        if orientation_key is None:
-            return img
-            
-        orientation = exif.get(orientation_key)
-        
-        # Aplicar rotación según orientación EXIF
-        if orientation == 3:
-            img = img.rotate(180, expand=True)
-        elif orientation == 6:
-            img = img.rotate(270, expand=True)
-        elif orientation == 8:
-            img = img.rotate(90, expand=True)
-            
-        print(f"   📐 Orientación EXIF corregida: {orientation}")
-        
-    except (AttributeError, KeyError, IndexError, TypeError) as e:
-        # Si no hay EXIF o hay error, devolver imagen original
-        print(f"   ℹ️ No se pudo leer EXIF o no tiene orientación: {e}")
-        pass
-    return img
-
 # =============== PERFIL DEL DOCENTE ===============
 
 @router.get("/perfil", response_model=DocenteResponse)
@@ -128,58 +100,75 @@ async def listar_materias_asignadas(current_user: Dict = Depends(get_current_use
     if current_user["role"] != "docente":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    docente = await docentes_collection.find_one({"_id": current_user["user_id"]})
-    if not docente:
+    # Una sola agregación: docente -> materias asignadas -> conteo de evidencias por materia.
+    # Las referencias se comparan como string, así que sirven materias con _id ObjectId o string.
+    pipeline = [
+        {"$match": {"_id": current_user["user_id"]}},
+        {"$project": {
+            "grupos_asignados": 1,
+            "materias": {"$map": {
+                "input": {"$ifNull": ["$materias", []]},
+                "as": "m",
+                "in": {"$toString": "$$m"}
+            }}
+        }},
+        {"$lookup": {
+            "from": materias_collection.name,
+            "let": {"materias": "$materias"},
+            "pipeline": [
+                {"$match": {"$expr": {"$in": [{"$toString": "$_id"}, "$$materias"]}}},
+                {"$lookup": {
+                    "from": evidencias_collection.name,
+                    "let": {"materia_id": {"$toString": "$_id"}},
+                    "pipeline": [
+                        {"$match": {
+                            "docente_id": current_user["user_id"],
+                            "$expr": {"$eq": [{"$toString": "$materia_id"}, "$$materia_id"]}
+                        }},
+                        {"$count": "total"}
+                    ],
+                    "as": "evidencias"
+                }},
+                {"$project": {
+                    "nombre": 1,
+                    "codigo": 1,
+                    "evidencias_subidas": {"$ifNull": [{"$first": "$evidencias.total"}, 0]}
+                }}
+            ],
+            "as": "materias_asignadas"
+        }}
+    ]
+    
+    docentes = await docentes_collection.aggregate(pipeline).to_list(length=1)
+    if not docentes:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Docente no encontrado")
+    docente = docentes[0]
     
-    print(f"\n📚 DEBUG MATERIAS:")
-    print(f"   Docente: {docente.get('nombre')}")
-    print(f"   materias en BD: {docente.get('materias', [])}")
-    print(f"   Tipo: {type(docente.get('materias', []))}")
-    
-    materias_ids_str = docente.get("materias", [])
-    materias_object_ids = []
-    
-    # Convertir strings a ObjectId
-    for m_id in materias_ids_str:
-        try:
-            materias_object_ids.append(ObjectId(m_id))
-        except Exception as e:
-            print(f"   ⚠️ ID inválido ignorado: {m_id} - Error: {e}")
-
-    print(f"   IDs a buscar (ObjectId): {len(materias_object_ids)}")
-    
-    materias = await materias_collection.find(
-        {"_id": {"$in": materias_object_ids}}
-    ).to_list(length=100)
-    
-    print(f"   Materias encontradas: {len(materias)}")
-    
-    resultado = []
-    for materia in materias:
-        # Contar evidencias subidas para esta materia
-        count_evidencias = await evidencias_collection.count_documents({
-            "docente_id": current_user["user_id"],
-            "materia_id": materia["_id"]
-        })
-        
-        resultado.append({
+    return [
+        {
             "id": str(materia["_id"]),
             "nombre": materia["nombre"],
             "codigo": materia["codigo"],
             "grupos": docente.get("grupos_asignados", []),
-            "evidencias_subidas": count_evidencias
-        })
-    
-    return resultado
+            "evidencias_subidas": materia["evidencias_subidas"]
+        }
+        for materia in docente["materias_asignadas"]
+    ]
 
 @router.get("/estudiantes")
-async def listar_estudiantes(current_user: Dict = Depends(get_current_user)):
-    """Lista todos los estudiantes para vincular con evidencias"""
+async def listar_estudiantes(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Lista los estudiantes para vincular con evidencias (paginado por cursor)"""
     if current_user["role"] != "docente":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    estudiantes = await estudiantes_collection.find().sort("nombre", 1).to_list(length=1000)
+    estudiantes = await paginate(
+        estudiantes_collection, {}, page, response, ESTUDIANTE_VINCULACION_FIELDS,
+        sort_field="nombre", direction=1
+    )
     
     resultado = []
     for est in estudiantes:
@@ -207,7 +196,8 @@ async def subir_evidencia(
     
     # Verificar que el docente tenga asignada esta materia
     docente = await docentes_collection.find_one({"_id": current_user["user_id"]})
-    if str(materia_id) not in docente.get("materias", []):
+    materia_id = normalize_id(materia_id)
+    if materia_id not in normalize_ids(docente.get("materias", [])):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No tienes asignada esta materia")
     
     # Validar que sea una imagen
@@ -221,32 +211,52 @@ async def subir_evidencia(
     
     # Obtener extensión del archivo original
     file_extension = os.path.splitext(archivo.filename)[1]
-    hashed_filename = f"{file_hash}{file_extension}"
-    
-    # Guardar archivo
-    file_path = UPLOAD_DIR / hashed_filename
-    with open(file_path, "wb") as buffer:
-        content = await archivo.read()
-        buffer.write(content)
-    
-    # Guardar metadata en la base de datos
-    materia = await materias_collection.find_one({"_id": materia_id})
-    
-    nueva_evidencia = {
-        "estudiante_id": estudiante_id,
-        "docente_id": current_user["user_id"],
-        "materia_id": materia_id,
-        "grupo": grupo,
-        "aporte": aporte,
-        "descripcion": descripcion,
-        "archivo_nombre_original": archivo.filename,
-        "archivo_nombre_hash": hashed_filename,
-        "archivo_url": f"/uploads/evidencias/{hashed_filename}",
-        "content_type": archivo.content_type,
-        "fecha_subida": datetime.utcnow()
-    }
     
-    result = await evidencias_collection.insert_one(nueva_evidencia)
+    # Guardar archivo (por bloques, sin cargarlo completo en memoria) con nombre provisional
+    file_path = UPLOAD_DIR / f"tmp-{file_hash}{file_extension}"
+    try:
+        guardado = await save_upload(archivo, file_path)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="El archivo excede el tamaño máximo permitido")
+    
+    # Derivados para listados y visores; si la imagen no se puede procesar se guarda solo el original
+    try:
+        variantes = (await image_engine.variantes(file_path))["variantes"]
+    except ImageEngineError as e:
+        print(f"⚠️ No se generaron derivados de {file_path.name}: {e}")
+        variantes = {}
+    
+    # Nombre definitivo por hash de contenido (un duplicado no ocupa disco extra)
+    almacenado = await storage.store(file_path, guardado["sha256"], variantes)
+    hashed_filename = almacenado["archivo"]
+    
+    # La referencia ya se contó: si algo falla antes de insertar la evidencia, se libera
+    try:
+        # Guardar metadata en la base de datos
+        materia = await materias_catalog.get(materia_id)
+        
+        nueva_evidencia = {
+            "estudiante_id": normalize_id(estudiante_id),
+            "docente_id": current_user["user_id"],
+            "materia_id": materia_id,
+            "grupo": grupo,
+            "aporte": aporte,
+            "descripcion": descripcion,
+            "archivo_nombre_original": archivo.filename,
+            "archivo_nombre_hash": hashed_filename,
+            "archivo_url": f"/uploads/evidencias/{hashed_filename}",
+            "archivo_variantes": _urls_variantes(almacenado["variantes"]),
+            "content_type": archivo.content_type,
+            "archivo_bytes": guardado["bytes"],
+            "archivo_sha256": guardado["sha256"],
+            "archivo_contenido_id": guardado["sha256"],
+            "fecha_subida": datetime.utcnow()
+        }
+        
+        result = await evidencias_collection.insert_one(nueva_evidencia)
+    except Exception:
+        await storage.release(guardado["sha256"])
+        raise
     
     # REGISTRAR LOG
     await log_action(
@@ -294,11 +304,12 @@ async def subir_evidencia_temporal(
     file_extension = os.path.splitext(archivo.filename)[1]
     temp_filename = f"{temp_id}{file_extension}"
     
-    # Guardar archivo temporal
+    # Guardar archivo temporal (por bloques, sin cargarlo completo en memoria)
     temp_path = TEMP_DIR / temp_filename
-    with open(temp_path, "wb") as buffer:
-        content = await archivo.read()
-        buffer.write(content)
+    try:
+        await save_upload(archivo, temp_path)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="El archivo excede el tamaño máximo permitido")
     
     return {
         "temp_id": temp_id,
@@ -333,105 +344,64 @@ async def recortar_area_y_guardar(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archivo temporal no encontrado")
     
     try:
-        # Abrir imagen
-        img = Image.open(temp_path)
-        
-        print(f"\n📷 DEBUG PROCESAMIENTO IMAGEN:")
-        print(f"   Dimensión original: {img.width}x{img.height}")
-        print(f"   Formato: {img.format}")
-        
-        # PASO 1: Corregir orientación EXIF primero
-        img = correct_image_orientation(img)
-        print(f"   Dimensión después de orientación: {img.width}x{img.height}")
-        
         print(f"\n✂️ DEBUG RECORTE:")
         print(f"   crop_area recibido: {crop_area}")
-        print(f"   Tipo: {type(crop_area)}")
-        if crop_area:
-            print(f"   x: {crop_area.get('x', 'N/A')}")
-            print(f"   y: {crop_area.get('y', 'N/A')}")
-            print(f"   Width: {crop_area.get('width', 0)}")
-            print(f"   Height: {crop_area.get('height', 0)}")
-        else:
-            print(f"   ⚠️ crop_area es None o vacío")
-        
-        # PASO 2: Si hay área para recortar
-        if crop_area and crop_area.get("width", 0) > 0 and crop_area.get("height", 0) > 0:
-            x = int(crop_area["x"])
-            y = int(crop_area["y"])
-            width = int(crop_area["width"])
-            height = int(crop_area["height"])
-            
-            print(f"   ✅ RECORTANDO - Eliminando área seleccionada y todo arriba")
-            print(f"   📏 Imagen original: {img.width}x{img.height}")
-            print(f"   📐 Área seleccionada para eliminar: x={x}, y={y}, width={width}, height={height}")
-            
-            # Calcular desde dónde cortar: eliminar todo ARRIBA incluyendo el rectángulo
-            crop_from_y = y + height
-            print(f"   ✂️ Cortando desde Y={crop_from_y} hasta el final")
-            print(f"   📍 Coordenadas de recorte: left=0, top={crop_from_y}, right={img.width}, bottom={img.height}")
-            
-            # Guardar imagen ANTES del recorte para comparar (temporal)
-            temp_before = TEMP_DIR / f"before_{temp_filename}"
-            img.save(temp_before)
-            print(f"   💾 Imagen ANTES guardada en: {temp_before}")
-            
-            # Recortar imagen: (left, top, right, bottom)
-            # Eliminar todo desde arriba (0) hasta el borde inferior del rectángulo
-            img = img.crop((0, crop_from_y, img.width, img.height))
-            
-            # Guardar imagen DESPUÉS del recorte para comparar (temporal)
-            temp_after = TEMP_DIR / f"after_{temp_filename}"
-            img.save(temp_after)
-            print(f"   💾 Imagen DESPUÉS guardada en: {temp_after}")
-            
-            print(f"   ✅ Recorte completado. Nueva dimensión: {img.width}x{img.height}")
-        else:
-            print(f"   ⚠️ NO se recortará (área vacía o width=0)")
         
-        # Generar nombre hasheado final
+        # Hash de metadata: solo para el código de vinculación (el archivo se nombra por contenido)
         hash_input = f"{current_user['user_id']}{estudiante_id}{materia_id}{grupo}{aporte}{datetime.utcnow().isoformat()}"
         file_hash = hashlib.sha256(hash_input.encode()).hexdigest()[:16]
         file_extension = os.path.splitext(temp_filename)[1]
-        hashed_filename = f"{file_hash}{file_extension}"
-        
-        # Guardar imagen procesada
-        final_path = UPLOAD_DIR / hashed_filename
-        img.save(final_path)
         
-        # Eliminar archivo temporal
-        temp_path.unlink()
+        # Orientar, recortar y guardar en el pool de procesos (no bloquea el event loop)
+        procesado_path = UPLOAD_DIR / f"tmp-{file_hash}{file_extension}"
+        procesada = await image_engine.recortar(temp_path, procesado_path, crop_area)
+        print(f"   ✅ Imagen procesada: {procesada['width']}x{procesada['height']}")
         
-        # Obtener datos del estudiante y materia
-        materia = await materias_collection.find_one({"_id": ObjectId(materia_id)})
+        # Nombre definitivo por hash de contenido (reintentos del mismo recorte no duplican disco)
+        almacenado = await storage.store(procesado_path, procesada["sha256"], procesada["variantes"])
+        hashed_filename = almacenado["archivo"]
         
-        if not materia:
-             # Fallback si no se encuentra la materia
-             codigo_materia = "UNK"
-             nombre_materia = "Desconocida"
-        else:
-             codigo_materia = materia.get('codigo', 'MAT')
-             nombre_materia = materia.get('nombre', 'Desconocida')
+        # La referencia ya se contó: si algo falla antes de insertar la evidencia, se libera
+        try:
+            # Eliminar archivo temporal
+            temp_path.unlink(missing_ok=True)
+            
+            # Obtener datos del estudiante y materia
+            materia = await materias_catalog.get(materia_id)
+            
+            if not materia:
+                 # Fallback si no se encuentra la materia
+                 codigo_materia = "UNK"
+                 nombre_materia = "Desconocida"
+            else:
+                 codigo_materia = materia.get('codigo', 'MAT')
+                 nombre_materia = materia.get('nombre', 'Desconocida')
 
-        # Generar código de vinculación único
-        codigo_interno = f"{codigo_materia[:4].upper()}-{aporte.upper()[:3]}-{file_hash[:6].upper()}"
-        
-        # Guardar metadata en BD
-        nueva_evidencia = {
-            "codigo_interno": codigo_interno,
-            "estudiante_id": estudiante_id,
-            "docente_id": current_user["user_id"],
-            "materia_id": materia_id,
-            "grupo": grupo,
-            "aporte": aporte,
-            "descripcion": descripcion,
-            "archivo_nombre_hash": hashed_filename,
-            "archivo_url": f"/uploads/evidencias/{hashed_filename}",
-            "recortada": crop_area is not None and crop_area.get("width", 0) > 0,
-            "fecha_subida": datetime.utcnow()
-        }
-        
-        result = await evidencias_collection.insert_one(nueva_evidencia)
+            # Generar código de vinculación único
+            codigo_interno = f"{codigo_materia[:4].upper()}-{aporte.upper()[:3]}-{file_hash[:6].upper()}"
+            
+            # Guardar metadata en BD
+            nueva_evidencia = {
+                "codigo_interno": codigo_interno,
+                "estudiante_id": normalize_id(estudiante_id),
+                "docente_id": current_user["user_id"],
+                "materia_id": normalize_id(materia_id),
+                "grupo": grupo,
+                "aporte": aporte,
+                "descripcion": descripcion,
+                "archivo_nombre_hash": hashed_filename,
+                "archivo_url": f"/uploads/evidencias/{hashed_filename}",
+                "archivo_variantes": _urls_variantes(almacenado["variantes"]),
+                "archivo_sha256": procesada["sha256"],
+                "archivo_contenido_id": procesada["sha256"],
+                "recortada": procesada["recortada"],
+                "fecha_subida": datetime.utcnow()
+            }
+            
+            result = await evidencias_collection.insert_one(nueva_evidencia)
+        except Exception:
+            await storage.release(procesada["sha256"])
+            raise
         
         return {
             "id": str(result.inserted_id),
@@ -441,6 +411,19 @@ async def recortar_area_y_guardar(
             "materia_nombre": materia["nombre"] if materia else "Desconocida"
         }
         
+    except ImageTooLargeError:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="La imagen excede la resolución máxima permitida")
+    except InvalidImageError:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El archivo no es una imagen válida")
+    except ImageTimeoutError:
+        # El temporal se conserva para reintentar
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="El procesamiento de la imagen tardó demasiado, intente nuevamente")
+    except ImageEngineError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         # Limpiar archivo temporal en caso de error
         if temp_path.exists():
@@ -448,34 +431,27 @@ async def recortar_area_y_guardar(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al procesar imagen: {str(e)}")
 
 @router.get("/evidencias")
-async def listar_evidencias(current_user: Dict = Depends(get_current_user)):
-    """Lista todas las evidencias subidas por el docente"""
+async def listar_evidencias(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Lista las evidencias subidas por el docente (paginado por cursor)"""
     if current_user["role"] != "docente":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
     
-    evidencias = await evidencias_collection.find(
-        {"docente_id": current_user["user_id"]}
-    ).sort("fecha_subida", -1).to_list(length=1000)
+    evidencias = await paginate(
+        evidencias_collection,
+        {"docente_id": current_user["user_id"]},
+        page, response, EVIDENCIA_LISTADO_FIELDS, sort_field="fecha_subida", direction=-1
+    )
+    
+    # Nombres de materias desde el catálogo en memoria (sin consultas por fila)
+    materias = await materias_catalog.get_many(ev["materia_id"] for ev in evidencias)
     
     resultado = []
     for ev in evidencias:
-        # Buscar materia - puede ser string o ObjectId
-        materia_id = ev["materia_id"]
-        print(f"🔍 DEBUG EVIDENCIAS: Buscando materia {materia_id} (tipo: {type(materia_id)})")
-        
-        materia = await materias_collection.find_one({"_id": materia_id})
-        
-        # Si no se encuentra, intentar con el otro tipo
-        if not materia and isinstance(materia_id, str):
-            try:
-                materia = await materias_collection.find_one({"_id": ObjectId(materia_id)})
-            except:
-                pass
-        
-        if not materia and isinstance(materia_id, ObjectId):
-            materia = await materias_collection.find_one({"_id": str(materia_id)})
-        
-        print(f"   {'✅' if materia else '❌'} Materia: {materia['nombre'] if materia else 'NO ENCONTRADA'}")
+        materia = materias.get(normalize_id(ev["materia_id"]))
         
         resultado.append({
             "id": str(ev["_id"]),
@@ -485,6 +461,7 @@ async def listar_evidencias(current_user: Dict = Depends(get_current_user)):
             "descripcion": ev["descripcion"],
             "archivo_nombre_hash": ev["archivo_nombre_hash"],
             "archivo_url": ev["archivo_url"],
+            "archivo_variantes": ev.get("archivo_variantes", {}),
             "fecha_subida": ev["fecha_subida"],
             "codigo_interno": ev.get("codigo_interno", ""),
             "recortada": ev.get("recortada", False)
@@ -492,6 +469,47 @@ async def listar_evidencias(current_user: Dict = Depends(get_current_user)):
     
     return resultado
 
+@router.delete("/evidencias/{evidencia_id}")
+async def eliminar_evidencia(
+    evidencia_id: str,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Elimina una evidencia propia y libera su archivo"""
+    if current_user["role"] != "docente":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
+    
+    evidencia = await evidencias_collection.find_one({"_id": ObjectId(evidencia_id), "docente_id": current_user["user_id"]})
+    if not evidencia:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evidencia no encontrada")
+    
+    # No se elimina una evidencia que respalda una solicitud de recalificación
+    en_uso = await solicitudes_collection.find_one({
+        "estudiante_id": evidencia.get("estudiante_id"),
+        "docente_id": evidencia.get("docente_id"),
+        "materia_id": evidencia.get("materia_id"),
+        "grupo": evidencia.get("grupo"),
+        "aporte": evidencia.get("aporte")
+    }, {"_id": 1})
+    if en_uso:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="La evidencia está vinculada a una solicitud de recalificación")
+    
+    result = await evidencias_collection.delete_one({"_id": evidencia["_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evidencia no encontrada")
+    
+    if evidencia.get("archivo_contenido_id"):
+        # Almacenamiento por contenido: el recolector borra el archivo cuando nadie lo referencia
+        await storage.release(evidencia["archivo_contenido_id"])
+    else:
+        # Evidencias anteriores: archivo propio, se borra directamente
+        archivos = [evidencia.get("archivo_nombre_hash"), *[
+            Path(url).name for url in evidencia.get("archivo_variantes", {}).values()
+        ]]
+        for archivo in filter(None, archivos):
+            (UPLOAD_DIR / archivo).unlink(missing_ok=True)
+    
+    return {"message": "Evidencia eliminada exitosamente"}
+
 # =============== RECALIFICACIONES ===============
 
 @router.get("/recalificaciones", response_model=List[SolicitudResponse])
@@ -504,32 +522,18 @@ async def listar_recalificaciones_asignadas(current_user: Dict = Depends(get_cur
     print(f"   Docente ID: {current_user['user_id']}")
     
     # Buscar solicitudes donde este docente esté asignado como RECALIFICADOR
-    solicitudes = await solicitudes_collection.find({
+    solicitudes = await find_projected(solicitudes_collection, {
         "docente_recalificador_id": current_user["user_id"],
         "estado": {"$in": ["en_revision", "calificada"]}
-    }).sort("fecha_creacion", -1).to_list(length=1000)
+    }, SOLICITUD_LISTADO_FIELDS).sort("fecha_creacion", -1).to_list(length=1000)
     
     print(f"   Solicitudes encontradas: {len(solicitudes)}")
     
+    materias = await materias_catalog.get_many(sol["materia_id"] for sol in solicitudes)
+    
     resultado = []
     for sol in solicitudes:
-        # Buscar materia - puede ser string o ObjectId
-        materia_id = sol["materia_id"]
-        print(f"🔍 DEBUG RECALIFICACION: Buscando materia {materia_id} (tipo: {type(materia_id)})")
-        
-        materia = await materias_collection.find_one({"_id": materia_id})
-        
-        # Si no se encuentra, intentar con el otro tipo
-        if not materia and isinstance(materia_id, str):
-            try:
-                materia = await materias_collection.find_one({"_id": ObjectId(materia_id)})
-            except:
-                pass
-        
-        if not materia and isinstance(materia_id, ObjectId):
-            materia = await materias_collection.find_one({"_id": str(materia_id)})
-        
-        print(f"   {'✅' if materia else '❌'} Materia: {materia['nombre'] if materia else 'NO ENCONTRADA'}")
+        materia = materias.get(normalize_id(sol["materia_id"]))
         
         resultado.append(SolicitudResponse(
             id=str(sol["_id"]),
@@ -677,6 +681,7 @@ async def obtener_evidencia_solicitud(
     return {
         "id": str(evidencia["_id"]),
         "archivo_url": evidencia.get("archivo_url"),
+        "archivo_variantes": evidencia.get("archivo_variantes", {}),
         "archivo_nombre_hash": evidencia.get("archivo_nombre_hash"),
         "descripcion": evidencia.get("descripcion"),
         "recortada": evidencia.get("recortada", False),
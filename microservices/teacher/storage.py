@@ -0,0 +1,150 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+from pymongo import ReturnDocument
+from prometheus_client import Counter
+from common.config import settings
+from common.database import archivos_collection
+
+# =============== ALMACENAMIENTO DIRECCIONADO POR CONTENIDO ===============
+# Cada archivo procesado se guarda como {sha256}{ext} (y sus derivados como
+# {sha256}_{variante}.webp), así la misma imagen subida dos veces ocupa disco una vez.
+# La colección archivos lleva un contador de referencias por contenido: +1 por cada
+# evidencia que lo usa, -1 al eliminarla. El recolector borra los archivos sin
+# referencias después de un período de gracia, para no competir con un store
+# simultáneo del mismo contenido.
+
+UPLOAD_DIR = Path("uploads/evidencias")
+
+STORAGE_DEDUP = Counter(
+    "evidencias_storage_dedup_total",
+    "Evidencias cuyo contenido ya estaba almacenado"
+)
+STORAGE_GC_FILES = Counter(
+    "evidencias_storage_gc_files_total",
+    "Archivos eliminados por el recolector de almacenamiento"
+)
+
+def content_filename(sha256: str, ext: str) -> str:
+    return f"{sha256}{ext}"
+
+def content_variant_filename(sha256: str, nombre: str) -> str:
+    return f"{sha256}_{nombre}.webp"
+
+def _colocar(origen: Path, destino: Path, reemplazar: bool = False) -> bool:
+    """
+    Mueve origen a destino si destino no existe (o siempre, con reemplazar);
+    si ya existe descarta origen. True si se movió
+    """
+    if destino.exists() and not reemplazar:
+        origen.unlink(missing_ok=True)
+        return False
+    os.replace(origen, destino)
+    return True
+
+async def store(procesado: Path, sha256: str, variantes: Dict[str, str]) -> dict:
+    """
+    Registra un archivo procesado bajo su hash de contenido.
+    `procesado` y los derivados en `variantes` (nombre -> archivo en UPLOAD_DIR) se
+    renombran a su nombre definitivo o se descartan si el contenido ya existía.
+    Retorna {"archivo", "variantes", "duplicado"}.
+    """
+    ext = procesado.suffix
+    archivo = content_filename(sha256, ext)
+    finales = {nombre: content_variant_filename(sha256, nombre) for nombre in variantes}
+    ahora = datetime.utcnow()
+
+    # Primero la referencia y luego el archivo: el recolector nunca ve refs=0 mientras se guarda
+    doc = await archivos_collection.find_one_and_update(
+        {"_id": sha256},
+        {
+            "$inc": {"refs": 1},
+            "$set": {"fecha_actualizacion": ahora},
+            "$setOnInsert": {"archivo": archivo, "variantes": finales, "fecha_creacion": ahora}
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+    # refs == 1: el documento se acaba de crear (o revivió desde refs=0). Se coloca
+    # siempre la copia propia, sin fiarse de un archivo que el recolector pueda estar borrando.
+    nuevo = doc["refs"] == 1
+    if doc["archivo"] != archivo:
+        # El mismo contenido ya está registrado con otra extensión: se usa ese archivo
+        await asyncio.to_thread(procesado.unlink, True)
+    else:
+        await asyncio.to_thread(_colocar, procesado, UPLOAD_DIR / archivo, nuevo)
+    for nombre, temporal in variantes.items():
+        await asyncio.to_thread(_colocar, UPLOAD_DIR / temporal, UPLOAD_DIR / finales[nombre], nuevo)
+
+    if not nuevo:
+        STORAGE_DEDUP.inc()
+
+    return {"archivo": doc["archivo"], "variantes": doc.get("variantes", finales), "duplicado": not nuevo}
+
+async def release(sha256: str):
+    """Quita una referencia al contenido (al eliminar una evidencia)"""
+    await archivos_collection.update_one(
+        {"_id": sha256},
+        {"$inc": {"refs": -1}, "$set": {"fecha_actualizacion": datetime.utcnow()}}
+    )
+
+def _apartar(archivos) -> list:
+    """Renombra los archivos a tmp-gc-*: desde aquí un store del mismo contenido los recrea"""
+    apartados = []
+    for archivo in archivos:
+        destino = UPLOAD_DIR / archivo
+        temporal = UPLOAD_DIR / f"tmp-gc-{archivo}"
+        try:
+            os.replace(destino, temporal)
+        except FileNotFoundError:
+            continue
+        apartados.append((temporal, destino))
+    return apartados
+
+def _restaurar(apartados: list):
+    """Devuelve a su lugar los archivos apartados (salvo que un store ya los haya recreado)"""
+    for temporal, destino in apartados:
+        _colocar(temporal, destino)
+
+def _descartar(apartados: list):
+    for temporal, _ in apartados:
+        temporal.unlink(missing_ok=True)
+
+async def collect_garbage() -> int:
+    """Elimina los archivos sin referencias cuya última actualización supera el período de gracia"""
+    limite = datetime.utcnow() - timedelta(seconds=settings.archivos_gc_grace_seconds)
+    eliminados = 0
+    cursor = archivos_collection.find(
+        {"refs": {"$lte": 0}, "fecha_actualizacion": {"$lt": limite}},
+        {"archivo": 1, "variantes": 1}
+    )
+    async for candidato in cursor:
+        # Primero se apartan los archivos y luego se borra el documento: un store que
+        # cree el documento de nuevo en medio siempre coloca su propia copia (refs == 1)
+        archivos = [candidato["archivo"], *candidato.get("variantes", {}).values()]
+        apartados = await asyncio.to_thread(_apartar, archivos)
+        # Borrado condicional: si alguien volvió a referenciarlo, se conserva
+        doc = await archivos_collection.find_one_and_delete(
+            {"_id": candidato["_id"], "refs": {"$lte": 0}, "fecha_actualizacion": {"$lt": limite}}
+        )
+        if not doc:
+            await asyncio.to_thread(_restaurar, apartados)
+            continue
+        await asyncio.to_thread(_descartar, apartados)
+        eliminados += 1
+    STORAGE_GC_FILES.inc(eliminados)
+    if eliminados:
+        print(f"🧹 Recolector de almacenamiento: {eliminados} archivo(s) sin referencias eliminados")
+    return eliminados
+
+async def gc_loop():
+    """Ejecuta el recolector periódicamente (tarea de fondo del servicio)"""
+    while True:
+        await asyncio.sleep(settings.archivos_gc_interval_seconds)
+        try:
+            await collect_garbage()
+        except Exception as e:
+            print(f"❌ Error en el recolector de almacenamiento: {e}")
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from prometheus_client import Counter, Gauge, Histogram
+from common.config import settings
+
+# =============== LIMPIEZA DE ARCHIVOS TEMPORALES ===============
+# uploads/temp guarda las imágenes subidas para previsualizar y recortar; si el docente
+# abandona el recorte quedan para siempre. El barrido periódico:
+#   1. borra lo que supera temp_ttl_seconds,
+#   2. si el directorio sigue sobre temp_quota_bytes, borra los más antiguos primero.
+# También borra los provisionales (tmp-*, *.part) que una falla dejó en uploads/evidencias.
+# Todo el I/O corre en hilos y por lotes, cediendo el event loop entre uno y otro.
+
+TEMP_DIR = Path("uploads/temp")
+EVIDENCIAS_DIR = Path("uploads/evidencias")
+
+# Nunca se desaloja por cuota un archivo más nuevo que esto (puede estar recortándose)
+QUOTA_MIN_AGE_SECONDS = 300
+# Pausa entre lotes para no acaparar el disco ni el event loop
+BATCH_PAUSE_SECONDS = 0.05
+
+TEMP_RECLAIMED_BYTES = Counter(
+    "temp_janitor_reclaimed_bytes_total",
+    "Bytes liberados por la limpieza de temporales",
+    ["reason"]
+)
+TEMP_RECLAIMED_FILES = Counter(
+    "temp_janitor_reclaimed_files_total",
+    "Archivos eliminados por la limpieza de temporales",
+    ["reason"]
+)
+TEMP_DIR_BYTES = Gauge(
+    "temp_janitor_temp_dir_bytes",
+    "Bytes ocupados en uploads/temp tras el último barrido"
+)
+TEMP_SWEEP_DURATION = Histogram(
+    "temp_janitor_sweep_duration_seconds",
+    "Duración de un barrido completo"
+)
+
+def _listar(directorio: Path, filtro=None) -> List[Tuple[Path, int, float]]:
+    """(ruta, bytes, mtime) de los archivos del directorio"""
+    archivos = []
+    try:
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file(follow_symlinks=False):
+                    continue
+                if filtro and not filtro(entrada.name):
+                    continue
+                try:
+                    info = entrada.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                archivos.append((Path(entrada.path), info.st_size, info.st_mtime))
+    except FileNotFoundError:
+        pass
+    return archivos
+
+def _borrar(lote: List[Tuple[Path, int, float]]) -> Tuple[int, int]:
+    archivos, liberados = 0, 0
+    for ruta, tamano, _ in lote:
+        try:
+            ruta.unlink()
+        except FileNotFoundError:
+            continue
+        archivos += 1
+        liberados += tamano
+    return archivos, liberados
+
+def _es_provisional(nombre: str) -> bool:
+    return nombre.startswith("tmp-") or nombre.endswith(".part")
+
+class TempJanitor:
+    """Barrido periódico de temporales con TTL y cuota de disco"""
+
+    def __init__(self, ttl_seconds: int, quota_bytes: int, interval_seconds: int, batch_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.quota_bytes = quota_bytes
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"❌ Error en la limpieza de temporales: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def _eliminar(self, archivos: list, reason: str):
+        for i in range(0, len(archivos), self.batch_size):
+            cantidad, liberados = await asyncio.to_thread(_borrar, archivos[i:i + self.batch_size])
+            TEMP_RECLAIMED_FILES.labels(reason=reason).inc(cantidad)
+            TEMP_RECLAIMED_BYTES.labels(reason=reason).inc(liberados)
+            await asyncio.sleep(BATCH_PAUSE_SECONDS)
+
+    async def sweep(self):
+        """Un barrido completo: TTL, provisionales y cuota"""
+        inicio = time.perf_counter()
+        ahora = time.time()
+        limite_ttl = ahora - self.ttl_seconds
+
+        # 1. Temporales vencidos (incluye before_/after_ y previsualizaciones abandonadas)
+        temporales = await asyncio.to_thread(_listar, TEMP_DIR)
+        vencidos = [a for a in temporales if a[2] < limite_ttl]
+        await self._eliminar(vencidos, "ttl")
+        vigentes = [a for a in temporales if a[2] >= limite_ttl]
+
+        # 2. Provisionales huérfanos en evidencias/ (procesamiento interrumpido)
+        provisionales = await asyncio.to_thread(_listar, EVIDENCIAS_DIR, _es_provisional)
+        await self._eliminar([a for a in provisionales if a[2] < limite_ttl], "provisional")
+
+        # 3. Cuota: se desalojan los más antiguos hasta quedar bajo el límite
+        ocupado = sum(a[1] for a in vigentes)
+        if ocupado > self.quota_bytes:
+            desalojar = []
+            for archivo in sorted(vigentes, key=lambda a: a[2]):
+                if ocupado <= self.quota_bytes or archivo[2] > ahora - QUOTA_MIN_AGE_SECONDS:
+                    break
+                desalojar.append(archivo)
+                ocupado -= archivo[1]
+            await self._eliminar(desalojar, "cuota")
+
+        TEMP_DIR_BYTES.set(ocupado)
+        TEMP_SWEEP_DURATION.observe(time.perf_counter() - inicio)
+
+temp_janitor = TempJanitor(
+    ttl_seconds=settings.temp_ttl_seconds,
+    quota_bytes=settings.temp_quota_bytes,
+    interval_seconds=settings.temp_janitor_interval_seconds,
+    batch_size=settings.temp_janitor_batch_size
+)